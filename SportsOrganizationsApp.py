@@ -1,113 +1,1377 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import os
 import sys
+import datetime
+import threading
+import configparser
+import csv
+import numbers
+import re
+import weakref
+import atexit
+import sqlite3
+from bisect import bisect_left
+from contextlib import contextmanager
+from collections import OrderedDict, namedtuple
+from itertools import chain, count
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
+    QTableView, QPushButton, QLineEdit, QComboBox,
     QDateEdit, QMessageBox, QLabel, QDialog, QFormLayout, QGroupBox,
-    QHeaderView, QTimeEdit
+    QHeaderView, QTimeEdit, QStyledItemDelegate, QProgressBar, QFileDialog, QMenu
+)
+from PyQt5.QtGui import QColor, QPalette, QFont, QPixmap, QPainter, QIntValidator
+from PyQt5.QtCore import (
+    Qt, QDate, QTime, QAbstractTableModel, QModelIndex, QEvent, QRect, QSize,
+    QObject, QRunnable, QThreadPool, QSocketNotifier, QTimer, pyqtSignal,
+    QSortFilterProxyModel
+)
+import json
+import migrations
+import replica
+
+psycopg2 = None
+
+
+DEFAULT_DB_SETTINGS = {
+    'dbname': "",
+    'user': "",
+    'password': "",
+    'host': "",
+    'port': "5432",
+    'pool_min': "4",
+    'pool_max': "10",
+    'connect_timeout': "10",
+    'keepalives_idle': "30",
+    'keepalives_interval': "10",
+    'keepalives_count': "3",
+    'statement_timeout': "30000",
+    'migrate_on_start': "yes",
+}
+
+REQUIRED_DB_SETTINGS = ["dbname", "user", "host"]
+
+CONFIG_PATH = os.environ.get(
+    "SPORTS_DB_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sportsorganizations.ini")
 )
-from PyQt5.QtGui import QColor, QPalette, QFont, QPixmap
-from PyQt5.QtCore import Qt, QDate, QTime
-from werkzeug.security import generate_password_hash, check_password_hash
-import psycopg2
+
+
+DEFAULT_SECURITY_SETTINGS = {
+    'password_method': "scrypt:32768:8:1",
+    'salt_length': "16",
+}
+
+
+DEFAULT_UI_SETTINGS = {
+    'prefetch_tabs': "yes",
+    'prefetch_delay': "2000",
+    'startup_report': "no",
+}
+
+
+DEFAULT_DIAGNOSTICS_SETTINGS = {
+    'slow_query_ms': "500",
+    'explain_slow': "no",
+    'query_stats': "yes",
+}
+
+
+DEFAULT_REPLICA_SETTINGS = {
+    'enabled': "no",
+    'path': "sportsorganizations.sqlite3",
+    'sync_interval': "600000",
+    'replay_interval': "10000",
+}
+
+
+def load_settings(section, defaults, env_prefix, path=CONFIG_PATH):
+    settings = dict(defaults)
+
+    parser = configparser.ConfigParser()
+    if parser.read(path, encoding="utf-8") and parser.has_section(section):
+        settings.update(parser[section])
+
+    for key in settings:
+        value = os.environ.get(f"{env_prefix}{key.upper()}")
+        if value is not None:
+            settings[key] = value
+    return settings
+
+
+def load_db_settings(path=CONFIG_PATH):
+    return load_settings("database", DEFAULT_DB_SETTINGS, "SPORTS_DB_", path)
+
+
+def elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+def setting_enabled(value):
+    return value.strip().lower() in ("1", "yes", "true", "on")
+
+
+def load_driver():
+    global psycopg2
+    import psycopg2
+    import psycopg2.errors
+    import psycopg2.extensions
+    import psycopg2.pool
+    return psycopg2
+
+
+class StartupTimer:
+    def __init__(self, started_at=STARTED_AT, enabled=True):
+        self.started_at = started_at
+        self.enabled = enabled
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.started_at
+        self.report()
+
+    def report(self, required=("импорт", "стиль", "окно входа", "подключение")):
+        if not self.enabled or self.reported or not all(name in self.marks for name in required):
+            return
+        self.reported = True
+        timings = ", ".join(f"{name} {elapsed * 1000:.0f} мс" for name, elapsed in self.marks.items())
+        print(f"Время запуска: {timings}")
+
+
+class RegistrationError(Exception):
+    pass
+
+
+class CsvImportError(Exception):
+    pass
+
+
+class PasswordPolicy:
+    def __init__(self, settings=None):
+        settings = settings or load_settings("security", DEFAULT_SECURITY_SETTINGS, "SPORTS_")
+        self.method = settings['password_method']
+        self.salt_length = int(settings['salt_length'])
+        self.signature = None
+
+    def hash(self, password):
+        from werkzeug.security import generate_password_hash
+        password_hash = generate_password_hash(password, self.method, self.salt_length)
+        if self.signature is None:
+            self.signature = password_hash.split("$", 1)[0]
+        return password_hash
+
+    def verify(self, password_hash, password):
+        from werkzeug.security import check_password_hash
+        return check_password_hash(password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        if self.signature is None:
+            self.hash("")
+        method, _, rest = password_hash.partition("$")
+        salt = rest.partition("$")[0]
+        return method != self.signature or len(salt) != self.salt_length
+
+
+ROLE_TABLES = [
+    ("athletes", "id_athlete", "athlete"),
+    ("trainers", "id_trainer", "trainer"),
+    ("judges", "id_judge", "judge"),
+    ("organizers", "id_organizer", "organizer")
+]
+
+CHANGES_CHANNEL = "sportsorganizations_changes"
+
+IMPORT_DATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.import_date(value text) RETURNS date AS $$
+BEGIN
+    RETURN CASE
+        WHEN value ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}$' THEN to_date(value, 'YYYY-MM-DD')
+        WHEN value ~ '^[0-9]{2}[.][0-9]{2}[.][0-9]{4}$' THEN to_date(value, 'DD.MM.YYYY')
+    END;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+IMPORT_REFERENCES = {
+    'id_athlete': "athletes",
+    'id_medal': "medals",
+}
+
+SEARCH_DELAY = 300
+
+PREPARABLE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|VALUES)\b", re.IGNORECASE)
+PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def positional_query(query):
+    keys = []
+    positions = count()
+
+    def replace(match):
+        if match.group(0) == "%%":
+            return "%"
+        key = match.group(1) if match.group(1) is not None else next(positions)
+        if key not in keys:
+            keys.append(key)
+        return f"${keys.index(key) + 1}"
+
+    return PLACEHOLDER.sub(replace, query), keys
+
+
+QUERY_CONTEXT = threading.local()
+
+
+@contextmanager
+def query_label(label):
+    previous = getattr(QUERY_CONTEXT, 'label', None)
+    QUERY_CONTEXT.label = label
+    try:
+        yield
+    finally:
+        QUERY_CONTEXT.label = previous
+
+
+class QueryStats:
+    bounds = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(self, settings=None):
+        settings = settings or load_settings("diagnostics", DEFAULT_DIAGNOSTICS_SETTINGS, "SPORTS_")
+        self.slow_ms = float(settings['slow_query_ms'])
+        self.explain = setting_enabled(settings['explain_slow'])
+        self.report_on_exit = setting_enabled(settings['query_stats'])
+        self.lock = threading.Lock()
+        self.labels = {}
+
+    def record(self, elapsed, rows, failed=False):
+        label = getattr(QUERY_CONTEXT, 'label', None) or "other"
+        with self.lock:
+            entry = self.labels.get(label)
+            if entry is None:
+                entry = self.labels[label] = {
+                    'count': 0, 'errors': 0, 'rows': 0, 'total': 0.0, 'max': 0.0,
+                    'histogram': [0] * (len(self.bounds) + 1)
+                }
+            entry['count'] += 1
+            entry['errors'] += bool(failed)
+            entry['rows'] += rows
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['histogram'][bisect_left(self.bounds, elapsed)] += 1
+        return label
+
+    def percentile(self, entry, fraction):
+        target = fraction * entry['count']
+        seen = 0
+        for bound, hits in zip(self.bounds, entry['histogram']):
+            seen += hits
+            if seen >= target:
+                return min(bound, entry['max'])
+        return entry['max']
+
+    def snapshot(self):
+        with self.lock:
+            entries = {label: dict(entry, histogram=list(entry['histogram']))
+                       for label, entry in self.labels.items()}
+        return {
+            label: {
+                'count': entry['count'],
+                'errors': entry['errors'],
+                'rows': entry['rows'],
+                'total_ms': round(entry['total'], 3),
+                'avg_ms': round(entry['total'] / entry['count'], 3),
+                'p50_ms': round(self.percentile(entry, 0.5), 3),
+                'p95_ms': round(self.percentile(entry, 0.95), 3),
+                'max_ms': round(entry['max'], 3),
+                'histogram': {
+                    f"<={bound}" if bound is not None else f">{self.bounds[-1]}": hits
+                    for bound, hits in zip(self.bounds + (None,), entry['histogram']) if hits
+                }
+            }
+            for label, entry in entries.items()
+        }
+
+    def report(self):
+        stats = self.snapshot()
+        lines = ["Статистика запросов (мс):"]
+        for label, entry in sorted(stats.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(
+                f"  {label}: запросов {entry['count']}, ошибок {entry['errors']}, "
+                f"строк {entry['rows']}, среднее {entry['avg_ms']:.1f}, "
+                f"p50 {entry['p50_ms']:.1f}, p95 {entry['p95_ms']:.1f}, макс {entry['max_ms']:.1f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self):
+        if self.report_on_exit and self.labels:
+            print(self.report())
+
+
+class Reference:
+    __slots__ = ('entity', 'id', 'label')
+
+    def __init__(self, entity, row_id, label=None):
+        self.entity = entity
+        self.id = row_id
+        self.label = label
+
+    def __str__(self):
+        return self.label or ""
+
+
+class ReferenceCache:
+    entities = {
+        'athlete': ("athletes", "id_athlete", "firstname || ' ' || lastname"),
+        'medal': ("medals", "id_medal", "material || ' (' || color || ')'"),
+        'venue': ("venues", "id_venue", "name"),
+        'inventory': ("sports_inventories", "id_inventory", "product_name"),
+    }
+
+    def __init__(self, db, max_size=10000, ttl=300):
+        self.db = db
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def resolve(self, entity, ids):
+        labels = {}
+        missing = []
+        now = time.monotonic()
+        with self.lock:
+            for row_id in set(ids):
+                entry = self.entries.get((entity, row_id))
+                if entry is not None and entry[1] > now:
+                    self.entries.move_to_end((entity, row_id))
+                    labels[row_id] = entry[0]
+                else:
+                    missing.append(row_id)
+
+        if missing:
+            table, key, label = self.entities[entity]
+            result = self.db.execute(
+                f"SELECT {key}, {label} FROM sportsorganizations.{table} WHERE {key} = ANY(%s)",
+                (missing,), fetch=True, replicated=True
+            )
+            if result is False:
+                return labels
+            fetched = dict.fromkeys(missing)
+            fetched.update(result)
+            labels.update(fetched)
+            with self.lock:
+                for row_id, label in fetched.items():
+                    self.entries[(entity, row_id)] = (label, now + self.ttl)
+                    self.entries.move_to_end((entity, row_id))
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return labels
+
+    def label_sql(self, entity, alias):
+        table, key, label = self.entities[entity]
+        return f"(SELECT {label} FROM sportsorganizations.{table} r WHERE r.{key} = {alias}.{key}) AS {entity}"
+
+    def invalidate(self, table, row_id=None):
+        for entity, (entity_table, _, _) in self.entities.items():
+            if entity_table != table:
+                continue
+            with self.lock:
+                if row_id is not None:
+                    self.entries.pop((entity, row_id), None)
+                else:
+                    for key in [key for key in self.entries if key[0] == entity]:
+                        del self.entries[key]
+            return entity
+        return None
 
 
 class Database:
-    def __init__(self):
-        self.conn = None
+    itersize = 500
+    prepared_limit = 200
+    ping_after = 5
+
+    def __init__(self, settings=None):
+        self.settings = settings or load_db_settings()
+        self.pool = None
+        self.slots = None
+        self.cursor_ids = count(1)
+        self.statement_ids = count(1)
+        self.prepared = weakref.WeakKeyDictionary()
+        self.prepared_lock = threading.Lock()
+        self.last_used = weakref.WeakKeyDictionary()
+        self.active = {}
+        self.thread_pool = QThreadPool()
+        self.ready = threading.Event()
+        self.schema_version = 0
+        self.accounts_ready = False
+        self.changes_ready = False
+        self.own_pids = set()
+        self.password_policy = PasswordPolicy()
+        self.references = ReferenceCache(self)
+        self.stats = QueryStats()
+        self.replica_settings = load_settings("replica", DEFAULT_REPLICA_SETTINGS, "SPORTS_REPLICA_")
+        self.replica = self.open_replica()
 
     def connect(self):
+        settings = self.settings
+        pool_max = int(settings['pool_max'])
+        missing = [key for key in REQUIRED_DB_SETTINGS if not settings[key].strip()]
+        if missing:
+            print(f"Ошибка подключения: не заданы параметры {', '.join(missing)} "
+                  f"(секция [database] в {CONFIG_PATH} или переменные SPORTS_DB_*)")
+            self.ready.set()
+            return False
+        load_driver()
         try:
-            self.conn = psycopg2.connect(
-                dbname="db2991_17",
-                user="st2991",
-                password="pwd2991",
-                host="172.20.7.53",
-                port="5432"
+            self.pool = psycopg2.pool.ThreadedConnectionPool(
+                int(settings['pool_min']), pool_max, **self.connection_kwargs()
             )
-            return True
+            self.slots = threading.BoundedSemaphore(pool_max)
+            self.thread_pool.setMaxThreadCount(pool_max)
         except psycopg2.Error as e:
             print(f"Ошибка подключения: {e}")
             return False
+        finally:
+            self.ready.set()
 
-    def register_user(self, username, password, role, **kwargs):
-        table_map = {
-            "athlete": ("athletes", "id_athlete"),
-            "trainer": ("trainers", "id_trainer"),
-            "judge": ("judges", "id_judge"),
-            "organizer": ("organizers", "id_organizer")
+        if setting_enabled(settings['migrate_on_start']):
+            self.migrate()
+        try:
+            with self.connection() as conn:
+                self.schema_version = migrations.current_version(conn)
+        except psycopg2.Error as e:
+            print(f"Ошибка выполнения запроса: {e}")
+        self.accounts_ready = self.schema_version >= 2
+        self.changes_ready = self.schema_version >= 3
+        return True
+
+    def open_replica(self):
+        if not setting_enabled(self.replica_settings['enabled']):
+            return None
+        try:
+            return replica.LocalReplica(os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), self.replica_settings['path']))
+        except sqlite3.Error as e:
+            print(f"Ошибка открытия локальной копии: {e}")
+            return None
+
+    @property
+    def replica_ready(self):
+        return self.replica is not None and self.replica.ready
+
+    def migrate(self, target=migrations.LATEST_VERSION):
+        try:
+            with self.connection() as conn:
+                return migrations.migrate(conn, target)
+        except psycopg2.Error as e:
+            print(f"Ошибка миграции схемы: {e}")
+            return False
+
+    def connection_kwargs(self):
+        settings = self.settings
+        return {
+            'dbname': settings['dbname'],
+            'user': settings['user'],
+            'password': settings['password'],
+            'host': settings['host'],
+            'port': settings['port'],
+            'connect_timeout': int(settings['connect_timeout']),
+            'keepalives': 1,
+            'keepalives_idle': int(settings['keepalives_idle']),
+            'keepalives_interval': int(settings['keepalives_interval']),
+            'keepalives_count': int(settings['keepalives_count']),
+            'options': f"-c statement_timeout={int(settings['statement_timeout'])}",
+            'application_name': "SportsOrganizationsApp"
         }
 
+    def listen(self, channel):
+        conn = psycopg2.connect(**self.connection_kwargs())
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {channel}")
+        return conn
+
+    def close(self):
+        self.thread_pool.clear()
+        for thread_id in list(self.active):
+            self.cancel(thread_id)
+        self.thread_pool.waitForDone(int(self.settings['connect_timeout']) * 1000)
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+            self.own_pids.clear()
+        if self.replica is not None:
+            self.replica.close()
+            self.replica = None
+
+    def submit(self, job):
+        self.thread_pool.start(job)
+        return job
+
+    def cancel(self, thread_id):
+        for conn in list(self.active.get(thread_id, ())):
+            if conn.closed:
+                continue
+            try:
+                conn.cancel()
+            except psycopg2.Error as e:
+                print(f"Ошибка отмены запроса: {e}")
+
+    @contextmanager
+    def connection(self):
+        timeout = int(self.settings['connect_timeout'])
+        if not self.ready.wait(timeout) or self.pool is None:
+            raise load_driver().pool.PoolError("Нет подключения к базе данных")
+        if not self.slots.acquire(timeout=timeout):
+            raise psycopg2.pool.PoolError("Нет свободных соединений с базой данных")
+        try:
+            conn = self.checkout()
+        except psycopg2.Error as e:
+            self.slots.release()
+            raise psycopg2.pool.PoolError(str(e).strip()) from e
+
+        thread_id = threading.get_ident()
+        pid = conn.get_backend_pid()
+        self.active.setdefault(thread_id, []).append(conn)
+        self.own_pids.add(pid)
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            stack = self.active[thread_id]
+            stack.remove(conn)
+            if not stack:
+                del self.active[thread_id]
+            self.pool.putconn(conn, close=bool(conn.closed))
+            if conn.closed:
+                self.own_pids.discard(pid)
+            else:
+                self.last_used[conn] = time.monotonic()
+
+    def checkout(self):
+        while True:
+            conn = self.pool.getconn()
+            used = self.last_used.get(conn)
+            pid = None
+            try:
+                pid = conn.get_backend_pid()
+                if conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    raise psycopg2.InterfaceError("connection already closed")
+                if used is None or time.monotonic() - used > self.ping_after:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                return conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                print(f"Соединение с базой данных разорвано, открывается новое: {e}")
+                self.own_pids.discard(pid)
+                self.pool.putconn(conn, close=True)
+            self.slots.release()
+
+    def register_user(self, username, password, role, **kwargs):
+        table_map = {table_role: (table, id_field) for table, id_field, table_role in ROLE_TABLES}
+
         if role not in table_map:
-            QMessageBox.warning(None, "Ошибка", "Неверная роль пользователя")
-            return None
+            raise RegistrationError("Неверная роль пользователя")
 
         table, id_field = table_map[role]
 
-        check_query = f"SELECT username FROM sportsorganizations.{table} WHERE username = %s"
+        if self.accounts_ready:
+            check_query = "SELECT username FROM sportsorganizations.accounts WHERE username = %s"
+        else:
+            check_query = f"SELECT username FROM sportsorganizations.{table} WHERE username = %s"
 
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(check_query, (username,))
+            with self.connection() as conn, conn.cursor() as cursor:
+                self.run(cursor, check_query, (username,))
                 if cursor.fetchone():
-                    QMessageBox.warning(None, "Ошибка", "Пользователь с таким логином уже существует")
-                    return None
+                    raise RegistrationError("Пользователь с таким логином уже существует")
 
-                password_hash = generate_password_hash(password)
+                password_hash = self.password_policy.hash(password)
                 query = f"""
                 INSERT INTO sportsorganizations.{table} 
                 (username, passwordhash, firstname, lastname) 
                 VALUES (%s, %s, %s, %s) RETURNING {id_field}
                 """
 
-                cursor.execute(query, (username, password_hash,
-                                       kwargs.get('firstname'),
-                                       kwargs.get('lastname')))
+                self.run(cursor, query, (username, password_hash,
+                                         kwargs.get('firstname'),
+                                         kwargs.get('lastname')))
                 user_id = cursor.fetchone()[0]
-                self.conn.commit()
-                return {'id': user_id, 'username': username, 'role': role}
+            return {'id': user_id, 'username': username, 'role': role}
 
         except psycopg2.Error as e:
             print(f"Ошибка регистрации: {e}")
-            self.conn.rollback()
             if "unique constraint" in str(e).lower():
-                QMessageBox.warning(None, "Ошибка", "Пользователь с таким логином уже существует")
-            else:
-                QMessageBox.warning(None, "Ошибка БД", f"Ошибка при регистрации: {e}")
-            return None
+                raise RegistrationError("Пользователь с таким логином уже существует")
+            raise RegistrationError(f"Ошибка при регистрации: {e}")
 
     def authenticate(self, username, password):
-        tables = [
-            ("athletes", "id_athlete", "athlete"),
-            ("trainers", "id_trainer", "trainer"),
-            ("judges", "id_judge", "judge"),
-            ("organizers", "id_organizer", "organizer")
-        ]
-
-        for table, id_field, role in tables:
-            query = f"""
-            SELECT {id_field}, passwordhash FROM sportsorganizations.{table} 
-            WHERE username = %s
+        if self.accounts_ready:
+            query = """
+            SELECT role, user_id, passwordhash FROM sportsorganizations.accounts
+            WHERE username = %(username)s
             """
-            result = self.execute(query, (username,), fetch=True)
+        else:
+            query = " UNION ALL ".join(
+                f"(SELECT '{role}', {id_field}, passwordhash FROM sportsorganizations.{table} "
+                f"WHERE username = %(username)s)"
+                for table, id_field, role in ROLE_TABLES
+            )
+        result = self.execute(query, {'username': username}, fetch=True)
 
-            if result and check_password_hash(result[0][1], password):
-                return {'id': result[0][0], 'username': username, 'role': role}
+        for role, user_id, password_hash in result or []:
+            if password_hash and self.password_policy.verify(password_hash, password):
+                if self.password_policy.needs_rehash(password_hash):
+                    self.rehash_password(role, user_id, password)
+                return {'id': user_id, 'username': username, 'role': role}
 
         return None
 
-    def execute(self, query, params=None, fetch=False):
+    def rehash_password(self, role, user_id, password):
+        for table, id_field, table_role in ROLE_TABLES:
+            if table_role == role:
+                query = f"UPDATE sportsorganizations.{table} SET passwordhash = %s WHERE {id_field} = %s"
+                return self.execute(query, (self.password_policy.hash(password), user_id))
+        return False
+
+    def execute(self, query, params=None, fetch=False, replicated=False):
+        if replicated and self.replica_ready:
+            rows = self.read_replica(query, params)
+            return rows if fetch or rows is False else True
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(query, params)
-                if fetch:
-                    return cursor.fetchall()
-                self.conn.commit()
-                return True
+            return self.query(query, params, fetch)
         except psycopg2.Error as e:
             print(f"Ошибка выполнения запроса: {e}")
-            self.conn.rollback()
             return False
 
+    def query(self, query, params=None, fetch=False):
+        for attempt in range(2):
+            try:
+                with self.connection() as conn, conn.cursor() as cursor:
+                    self.run(cursor, query, params)
+                    result = cursor.fetchall() if fetch else True
+                return result
+            except psycopg2.errors.InvalidSqlStatementName:
+                if attempt:
+                    raise
+
+    def read_replica(self, query, params=None):
+        started = time.perf_counter()
+        try:
+            rows = self.replica.query(query, params)
+        except sqlite3.Error as e:
+            self.stats.record(elapsed_ms(started), 0, failed=True)
+            print(f"Ошибка чтения локальной копии: {e}")
+            return False
+        self.stats.record(elapsed_ms(started), len(rows))
+        return rows
+
+    def change(self, table, query, params, select):
+        action = query.split(None, 1)[0].upper()
+        sql = f"WITH changed AS ({query.rstrip()} RETURNING *) {select.format(source='changed')}"
+        if self.replica is None:
+            return self.execute(sql, params, fetch=True)
+
+        table = table.split(".")[-1]
+        if not self.replica.pending:
+            try:
+                rows = self.query(sql, params, fetch=True)
+            except psycopg2.Error as e:
+                if not isinstance(e, psycopg2.pool.PoolError):
+                    print(f"Ошибка выполнения запроса: {e}")
+                    return False
+                print(f"Нет связи с базой данных: {e}")
+            else:
+                self.mirror(table, action, [row[0] for row in rows])
+                return rows
+
+        if not self.replica.ready:
+            print("Локальная копия еще не синхронизирована, изменение не сохранено")
+            return False
+        try:
+            rows = self.replica.queue(table, action, query, params, select)
+        except sqlite3.Error as e:
+            print(f"Ошибка записи в локальную копию: {e}")
+            return False
+        if rows is None:
+            print("Изменяемые записи отсутствуют в локальной копии, изменение не сохранено")
+            return False
+        print("Изменение сохранено локально и будет отправлено при восстановлении связи")
+        return rows
+
+    def mirror(self, table, action, ids):
+        try:
+            if action == 'DELETE':
+                self.replica.delete(table, ids)
+            else:
+                with self.connection() as conn:
+                    self.replica.pull(conn, table, ids)
+        except (psycopg2.Error, sqlite3.Error) as e:
+            print(f"Ошибка обновления локальной копии: {e}")
+
+    def sync_replica(self, snapshot=False):
+        changes, conflicts = [], []
+        with self.connection() as conn:
+            if self.replica.pending:
+                changes, conflicts = self.replica.replay(conn)
+            if snapshot and not self.replica.pending and not conn.closed:
+                self.replica.snapshot(conn)
+        return changes, conflicts
+
+    def refresh_replica(self, changes):
+        result = []
+        with self.connection() as conn:
+            for table, ids in changes.items():
+                result.extend(self.replica.pull(conn, table, ids))
+        return result
+
+    def run(self, cursor, query, params=None):
+        started = time.perf_counter()
+        try:
+            self.execute_prepared(cursor, query, params)
+        except psycopg2.Error:
+            self.observe(cursor.connection, query, params, elapsed_ms(started), 0, failed=True)
+            raise
+        self.observe(cursor.connection, query, params, elapsed_ms(started), max(cursor.rowcount, 0))
+
+    def observe(self, conn, query, params, elapsed, rows, failed=False):
+        label = self.stats.record(elapsed, rows, failed)
+        if failed or elapsed < self.stats.slow_ms:
+            return
+        print(f"Медленный запрос [{label}] {elapsed:.0f} мс, строк: {rows}: {' '.join(query.split())}")
+        if self.stats.explain:
+            for line in self.explain(conn, query, params):
+                print(f"    {line}")
+
+    def explain(self, conn, query, params):
+        with conn.cursor() as cursor:
+            cursor.execute("SAVEPOINT explain_slow")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                return [row[0] for row in cursor.fetchall()]
+            except psycopg2.Error as e:
+                return [f"Ошибка получения плана: {e}"]
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow")
+
+    def execute_prepared(self, cursor, query, params=None):
+        if params is None or not PREPARABLE.match(query):
+            return cursor.execute(query, params)
+
+        conn = cursor.connection
+        with self.prepared_lock:
+            statements = self.prepared.setdefault(conn, OrderedDict())
+
+        statement = statements.get(query)
+        if statement is None:
+            sql, keys = positional_query(query)
+            name = f"sportsorganizations_{next(self.statement_ids)}"
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            statement = statements[query] = (name, keys)
+            if len(statements) > self.prepared_limit:
+                stale, _ = statements.popitem(last=False)[1]
+                cursor.execute(f"DEALLOCATE {stale}")
+        else:
+            statements.move_to_end(query)
+
+        name, keys = statement
+        values = [params[key] for key in keys]
+        try:
+            if values:
+                cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(values))})", values)
+            else:
+                cursor.execute(f"EXECUTE {name}")
+        except psycopg2.errors.InvalidSqlStatementName:
+            statements.clear()
+            raise
+
+    def import_csv(self, table, columns, path, merge=False):
+        kinds = dict(columns)
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            header_line = stream.readline()
+            try:
+                dialect = csv.Sniffer().sniff(header_line, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            header = [name.strip().lower() for name in next(csv.reader([header_line], dialect), [])]
+
+            unknown = [name for name in header if name not in kinds]
+            if unknown:
+                raise CsvImportError(f"Неизвестные столбцы: {', '.join(unknown)}")
+            missing = [name for name, kind in columns if kind == 'required' and name not in header]
+            if missing:
+                raise CsvImportError(f"Нет обязательных столбцов: {', '.join(missing)}")
+
+            checks = []
+            values = []
+            for name, kind in columns:
+                value = f"NULLIF(btrim(s.{name}), '')"
+                if kind == 'required':
+                    checks.append(f"WHEN {value} IS NULL THEN 'не заполнено поле {name}'")
+                elif kind == 'date':
+                    checks.append(
+                        f"WHEN {value} IS NOT NULL AND pg_temp.import_date({value}) IS NULL "
+                        f"THEN 'некорректная дата в поле {name}'")
+                    value = f"pg_temp.import_date({value})"
+                elif kind == 'gender':
+                    checks.append(f"WHEN {value} NOT IN ('М', 'Ж') THEN 'пол должен быть М или Ж'")
+                elif kind == 'reference':
+                    checks.append(f"WHEN {value} !~ '^[0-9]{{1,9}}$' THEN 'поле {name} должно быть числом'")
+                    checks.append(
+                        f"WHEN {value} IS NOT NULL AND NOT EXISTS ("
+                        f"SELECT 1 FROM sportsorganizations.{IMPORT_REFERENCES[name]} r "
+                        f"WHERE r.{name} = {value}::int) THEN 'нет записи с ID ' || {value} || ' для поля {name}'")
+                    value = f"{value}::int"
+                values.append(value)
+
+            with self.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(IMPORT_DATE_FUNCTION)
+                cursor.execute(
+                    f"CREATE TEMP TABLE import_staging (line serial, reject text, "
+                    f"{', '.join(f'{name} text' for name, kind in columns)}) ON COMMIT DROP"
+                )
+                cursor.copy_expert(
+                    f"COPY import_staging ({', '.join(header)}) FROM STDIN "
+                    f"WITH (FORMAT csv, DELIMITER '{dialect.delimiter}')",
+                    stream
+                )
+                cursor.execute(f"UPDATE import_staging s SET reject = CASE {' '.join(checks)} END")
+                cursor.execute("SELECT line + 1, reject FROM import_staging WHERE reject IS NOT NULL ORDER BY line")
+                rejects = cursor.fetchall()
+                cursor.execute("SELECT count(*) FROM import_staging")
+                total = cursor.fetchone()[0]
+
+                imported = 0
+                if merge:
+                    cursor.execute(f"""
+                        INSERT INTO {table} ({', '.join(name for name, kind in columns)})
+                        SELECT {', '.join(values)} FROM import_staging s
+                        WHERE s.reject IS NULL ORDER BY s.line
+                    """)
+                    imported = cursor.rowcount
+                else:
+                    conn.rollback()
+
+        if imported and self.replica is not None:
+            try:
+                with self.connection() as conn:
+                    self.replica.snapshot(conn, [table.split(".")[-1]])
+            except (psycopg2.Error, sqlite3.Error) as e:
+                print(f"Ошибка обновления локальной копии: {e}")
+        return {'total': total, 'imported': imported, 'rejects': rejects}
+
+    def export_csv(self, query, params, path, progress=None):
+        with self.connection() as conn, conn.cursor() as cursor:
+            self.run(cursor, f"SELECT count(*) FROM ({query}) export", params)
+            total = cursor.fetchone()[0]
+            copy_sql = cursor.mogrify(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", params)
+            try:
+                with open(path, "wb") as target:
+                    target.write(b"\xef\xbb\xbf")
+                    cursor.copy_expert(copy_sql.decode(conn.encoding), ExportWriter(target, total, progress))
+            except BaseException:
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+        return total
+
+    def stream(self, query, params=None, itersize=None, replicated=False, prepared=False):
+        if replicated and self.replica_ready:
+            yield from self.read_replica(query, params) or []
+            return
+        for attempt in range(2):
+            try:
+                yield from self.stream_rows(query, params, itersize or self.itersize, prepared)
+                return
+            except psycopg2.Error as e:
+                if isinstance(e, psycopg2.errors.InvalidSqlStatementName) and not attempt:
+                    continue
+                print(f"Ошибка выполнения запроса: {e}")
+                raise
+
+    def stream_rows(self, query, params, itersize, prepared):
+        with self.connection() as conn:
+            cursor = conn.cursor() if prepared else conn.cursor(name=f"stream_{next(self.cursor_ids)}")
+            with cursor:
+                cursor.itersize = itersize
+                elapsed = 0.0
+                rows = 0
+                failed = False
+                try:
+                    started = time.perf_counter()
+                    if prepared:
+                        self.execute_prepared(cursor, query, params)
+                    else:
+                        cursor.execute(query, params)
+                    elapsed += elapsed_ms(started)
+                    while True:
+                        started = time.perf_counter()
+                        batch = cursor.fetchmany(itersize)
+                        elapsed += elapsed_ms(started)
+                        if not batch:
+                            break
+                        for row in batch:
+                            rows += 1
+                            yield row
+                except psycopg2.Error:
+                    failed = True
+                    raise
+                finally:
+                    self.observe(conn, query, params, elapsed, rows, failed)
+
+
+class ExportWriter:
+    def __init__(self, target, total, progress=None):
+        self.target = target
+        self.total = total
+        self.progress = progress
+        self.rows = -1
+        self.step = max(1, total // 100)
+
+    def write(self, data):
+        self.target.write(data)
+        before = self.rows
+        self.rows += data.count(b"\n")
+        if self.progress is not None and self.rows // self.step != before // self.step:
+            self.progress(min(self.rows, self.total), self.total)
+
+
+class JobSignals(QObject):
+    batch = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class Job(QRunnable):
+    def __init__(self, fn, label=None):
+        super().__init__()
+        self.fn = fn
+        self.label = label
+        self.signals = JobSignals()
+        self.cancelled = False
+        self.thread_id = None
+
+    def run(self):
+        self.thread_id = threading.get_ident()
+        try:
+            with query_label(self.label):
+                result = self.fn(self)
+        except Exception as e:
+            print(f"Ошибка фоновой задачи: {e}")
+            self.thread_id = None
+            self.signals.failed.emit(str(e))
+            return
+        self.thread_id = None
+        self.signals.finished.emit(result)
+
+    def cancel(self, db):
+        self.cancelled = True
+        if self.thread_id is not None:
+            db.cancel(self.thread_id)
+
+
+class ReplicaSync(QObject):
+    changed = pyqtSignal(str, str, int)
+    conflicted = pyqtSignal(list)
+    status = pyqtSignal(str)
+    reconciled = pyqtSignal()
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.job = None
+        self.reconciling = False
+        self.remote_changes = {}
+        self.remote_timer = QTimer(self)
+        self.remote_timer.setSingleShot(True)
+        self.remote_timer.setInterval(200)
+        self.remote_timer.timeout.connect(self.apply_remote_changes)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(int(db.replica_settings['sync_interval']))
+        self.sync_timer.timeout.connect(lambda: self.sync(snapshot=True))
+        self.replay_timer = QTimer(self)
+        self.replay_timer.setInterval(int(db.replica_settings['replay_interval']))
+        self.replay_timer.timeout.connect(self.sync)
+
+    def start(self):
+        self.sync(snapshot=True)
+        self.sync_timer.start()
+        self.replay_timer.start()
+
+    def stop(self):
+        self.sync_timer.stop()
+        self.replay_timer.stop()
+        self.remote_timer.stop()
+
+    def sync(self, snapshot=False, reconcile=False):
+        self.reconciling = self.reconciling or reconcile
+        snapshot = snapshot or self.reconciling
+        if self.job is not None:
+            return
+        self.report()
+        if not snapshot and not self.db.replica.pending:
+            return
+        reconciling = self.reconciling
+        self.job = Job(lambda job: self.db.sync_replica(snapshot), "replica/sync")
+        self.job.signals.finished.connect(lambda result: self.on_synced(result, reconciling))
+        self.job.signals.failed.connect(self.on_failed)
+        self.db.submit(self.job)
+
+    def on_synced(self, result, reconciled):
+        self.job = None
+        changes, conflicts = result
+        for change in changes:
+            self.changed.emit(*change)
+        if conflicts:
+            self.conflicted.emit(conflicts)
+        self.report()
+        if reconciled:
+            self.reconciling = False
+            self.reconciled.emit()
+        elif self.reconciling:
+            self.sync()
+
+    def on_failed(self, message):
+        self.job = None
+        self.report()
+
+    def report(self):
+        pending = self.db.replica.pending
+        if pending:
+            self.status.emit(f"Нет связи с базой данных: изменений ожидает отправки: {pending}")
+        elif self.db.replica.ready:
+            self.status.emit(f"Локальная копия синхронизирована в {datetime.datetime.now():%H:%M:%S}")
+
+    def on_remote_change(self, table, action, row_id):
+        if table in replica.TABLES:
+            self.remote_changes.setdefault(table, set()).add(row_id)
+            self.remote_timer.start()
+
+    def apply_remote_changes(self):
+        changes, self.remote_changes = self.remote_changes, {}
+        job = Job(lambda job: self.db.refresh_replica(changes), "replica/refresh")
+        job.signals.finished.connect(lambda result: [self.changed.emit(*change) for change in result])
+        self.db.submit(job)
+
+
+class ChangeFeed(QObject):
+    changed = pyqtSignal(str, str, int)
+    restarted = pyqtSignal()
+
+    reconnect_interval = 5000
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.conn = None
+        self.notifier = None
+        self.job = None
+        self.started = False
+        self.stopped = False
+
+    def start(self):
+        if not self.db.changes_ready or self.stopped or self.job is not None:
+            return False
+        self.job = Job(lambda job: self.db.listen(CHANGES_CHANNEL), "changes/listen")
+        self.job.signals.finished.connect(self.on_listening)
+        self.job.signals.failed.connect(self.on_failed)
+        self.db.submit(self.job)
+        return True
+
+    def on_listening(self, conn):
+        self.job = None
+        if self.stopped:
+            conn.close()
+            return
+        self.conn = conn
+        self.notifier = QSocketNotifier(self.conn.fileno(), QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.poll)
+        if self.started:
+            self.restarted.emit()
+        self.started = True
+
+    def on_failed(self, message):
+        self.job = None
+        self.started = True
+        print(f"Ошибка подписки на изменения: {message}")
+        if not self.stopped:
+            QTimer.singleShot(self.reconnect_interval, self.start)
+
+    def stop(self):
+        self.stopped = True
+        self.drop()
+
+    def drop(self):
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def poll(self):
+        try:
+            self.conn.poll()
+        except psycopg2.Error as e:
+            print(f"Соединение с потоком изменений потеряно: {e}")
+            self.drop()
+            QTimer.singleShot(self.reconnect_interval, self.start)
+            return
+
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            if notify.pid in self.db.own_pids:
+                continue
+            try:
+                payload = json.loads(notify.payload)
+                self.changed.emit(payload['table'], payload['op'], int(payload['id']))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Некорректное уведомление об изменении: {e}")
+
+
+def format_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.date):
+        return value.strftime("%d.%m.%Y")
+    return str(value)
+
+
+def sort_key(value):
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (numbers.Number, datetime.date)):
+        return (1, value)
+    return (2, str(value).casefold())
+
+
+Column = namedtuple("Column", ["name", "header", "reference", "interned", "roles"],
+                    defaults=(None, False, None))
+
+RECORD_TYPES = {}
+
+
+def record_type(name, fields):
+    key = (name, tuple(fields))
+    if key not in RECORD_TYPES:
+        RECORD_TYPES[key] = namedtuple(name, fields)
+    return RECORD_TYPES[key]
+
+
+def source_row(index):
+    model = index.model()
+    while isinstance(model, QSortFilterProxyModel):
+        index = model.mapToSource(index)
+        model = index.model()
+    return index.row()
+
+
+class TableModel(QAbstractTableModel):
+    batch_size = 200
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.rows = []
+        self.buffer = []
+        self.positions = {}
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.buffer = []
+        self.positions = {}
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.clear()
+        self.append_rows(rows)
+
+    def append_rows(self, rows):
+        first = len(self.rows) + len(self.buffer)
+        self.positions.update((row[0], first + offset) for offset, row in enumerate(rows))
+        self.buffer.extend(rows)
+        if len(self.rows) < self.batch_size:
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = self.rows[index.row()]
+        if index.column() >= len(row):
+            return None
+        return format_cell(row[index.column()])
+
+    def sort_value(self, row, col):
+        values = self.rows[row]
+        return sort_key(values[col] if col < len(values) else None)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self.buffer)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.buffer:
+            return
+        batch = self.buffer[:self.batch_size]
+        del self.buffer[:self.batch_size]
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self.rows.extend(batch)
+        self.endInsertRows()
+
+    def record(self, row):
+        return self.rows[row]
+
+    def value(self, row, col):
+        return self.rows[row][col]
+
+    def text(self, row, col):
+        return format_cell(self.rows[row][col])
+
+    def first_value(self, col):
+        rows = self.rows or self.buffer
+        return rows[0][col] if rows else None
+
+    def last_value(self, col):
+        rows = self.buffer or self.rows
+        return rows[-1][col] if rows else None
+
+    def find_row(self, row_id):
+        position = self.positions.get(row_id)
+        return position if position is not None and position < len(self.rows) else None
+
+    def reindex(self):
+        self.positions = {row[0]: position for position, row in enumerate(chain(self.rows, self.buffer))}
+
+    def update_row(self, row_id, values):
+        position = self.positions.get(row_id)
+        if position is None:
+            return False
+        if position < len(self.rows):
+            self.rows[position] = values
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.headers) - 1))
+        else:
+            self.buffer[position - len(self.rows)] = values
+        return True
+
+    def references_to(self, columns, row_id):
+        for row in chain(self.rows, self.buffer):
+            for col in columns:
+                if isinstance(row[col], Reference) and row[col].id == row_id:
+                    return True
+        return False
+
+    def relabel(self, columns, row_id, label):
+        for row in self.buffer:
+            for col in columns:
+                if isinstance(row[col], Reference) and row[col].id == row_id:
+                    row[col].label = label
+        for index, row in enumerate(self.rows):
+            for col in columns:
+                if isinstance(row[col], Reference) and row[col].id == row_id:
+                    row[col].label = label
+                    self.dataChanged.emit(self.index(index, col), self.index(index, col))
+
+    def delete_row(self, row_id):
+        position = self.positions.get(row_id)
+        if position is None:
+            return False
+        if position < len(self.rows):
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self.rows[position]
+            self.endRemoveRows()
+        else:
+            del self.buffer[position - len(self.rows)]
+        self.reindex()
+        return True
+
+
+class TableProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterKeyColumn(-1)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return model.sort_value(left.row(), left.column()) < model.sort_value(right.row(), right.column())
+
+
+class ActionsDelegate(QStyledItemDelegate):
+    action_triggered = pyqtSignal(str, int)
+
+    row_height = 36
+    spacing = 6
+    margin = 4
+    labels = {'edit': "Изменить", 'delete': "Удалить"}
+    colors = {'edit': QColor("#2a82da"), 'delete': QColor("#e74c3c")}
+
+    def __init__(self, actions_for_row, parent=None):
+        super().__init__(parent)
+        self.actions_for_row = actions_for_row
+
+    def button_rects(self, rect, count):
+        inner = rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        if count == 0:
+            return []
+        width = (inner.width() - self.spacing * (count - 1)) // count
+        return [
+            QRect(inner.left() + i * (width + self.spacing), inner.top(), width, inner.height())
+            for i in range(count)
+        ]
+
+    def paint(self, painter, option, index):
+        actions = self.actions_for_row(source_row(index))
+        if not actions:
+            return super().paint(painter, option, index)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        for action, rect in zip(actions, self.button_rects(option.rect, len(actions))):
+            painter.setBrush(self.colors[action])
+            painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(Qt.white)
+        for action, rect in zip(actions, self.button_rects(option.rect, len(actions))):
+            label = option.fontMetrics.elidedText(self.labels[action], Qt.ElideRight, rect.width() - 4)
+            painter.drawText(rect, Qt.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            actions = self.actions_for_row(source_row(index))
+            for action, rect in zip(actions, self.button_rects(option.rect, len(actions))):
+                if rect.contains(event.pos()):
+                    self.action_triggered.emit(action, source_row(index))
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+    def preferred_width(self, font_metrics):
+        width = sum(font_metrics.horizontalAdvance(label) + 24 for label in self.labels.values())
+        return width + self.spacing + 2 * self.margin
+
+    def sizeHint(self, option, index):
+        return QSize(self.preferred_width(option.fontMetrics), self.row_height)
+
 
 def setup_style(app):
     app.setStyle("Fusion")
@@ -183,7 +1447,7 @@ def setup_style(app):
             color: white;
             padding: 5px;
         }
-        QTableWidget {
+        QTableView {
             gridline-color: #555;
         }
     """)
@@ -194,6 +1458,8 @@ class AuthWindow(QDialog):
         super().__init__()
         self.db = db
         self.user = None
+        self.login_job = None
+        self.connection_failed = False
         self.init_ui()
 
     def init_ui(self):
@@ -262,7 +1528,25 @@ class AuthWindow(QDialog):
             QMessageBox.warning(self, "Ошибка", "Заполните все поля")
             return
 
-        self.user = self.db.authenticate(username, password)
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText("Вход...")
+        self.login_job = Job(lambda job: self.db.authenticate(username, password), "auth/login")
+        self.login_job.signals.finished.connect(self.on_authenticated)
+        self.login_job.signals.failed.connect(lambda message: self.on_authenticated(None))
+        self.db.submit(self.login_job)
+
+    def on_connected(self, connected):
+        if not connected:
+            self.connection_failed = True
+            QMessageBox.warning(self, "Ошибка", "Не удалось подключиться к базе данных")
+            self.reject()
+
+    def on_authenticated(self, user):
+        self.login_job = None
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Войти")
+
+        self.user = user
         if self.user:
             self.accept()
         else:
@@ -280,6 +1564,7 @@ class RegisterDialog(QDialog):
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.register_job = None
         self.init_ui()
 
     def init_ui(self):
@@ -367,30 +1652,337 @@ class RegisterDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Заполните все поля")
             return
 
-        result = self.db.register_user(**data)
+        self.register_btn.setEnabled(False)
+        self.register_job = Job(lambda job: self.db.register_user(**data), "auth/register")
+        self.register_job.signals.finished.connect(self.on_registered)
+        self.register_job.signals.failed.connect(self.on_register_failed)
+        self.db.submit(self.register_job)
+
+    def on_registered(self, result):
+        self.register_job = None
+        self.register_btn.setEnabled(True)
         if result:
             self.accept()
         else:
             QMessageBox.warning(self, "Ошибка", "Не удалось зарегистрировать пользователя")
 
+    def on_register_failed(self, message):
+        self.register_job = None
+        self.register_btn.setEnabled(True)
+        QMessageBox.warning(self, "Ошибка", message)
+
+
+class ImportDialog(QDialog):
+    def __init__(self, db, table, columns, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.job = None
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Импорт из CSV")
+        self.resize(700, 500)
+
+        layout = QVBoxLayout()
+
+        hint = QLabel(
+            "Первая строка файла — заголовок с именами столбцов: "
+            + ", ".join(name for name, kind in self.columns)
+            + ". Даты в формате ДД.ММ.ГГГГ или ГГГГ-ММ-ДД."
+        )
+        hint.setWordWrap(True)
+
+        file_layout = QHBoxLayout()
+        self.path = QLineEdit(placeholderText="Файл CSV")
+        self.browse_button = QPushButton("Обзор...")
+        file_layout.addWidget(self.path)
+        file_layout.addWidget(self.browse_button)
+
+        self.summary = QLabel()
+        self.rejects = TableModel(["Строка", "Причина"], self)
+        rejects_view = QTableView()
+        rejects_view.setModel(self.rejects)
+        rejects_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setTextVisible(False)
+        self.progress.setMaximumHeight(12)
+        self.progress.hide()
+
+        buttons = QHBoxLayout()
+        self.check_button = QPushButton("Проверить")
+        self.import_button = QPushButton("Импортировать")
+        self.import_button.setStyleSheet("background-color: #2a82da;")
+        self.import_button.setEnabled(False)
+        self.close_button = QPushButton("Закрыть")
+        self.close_button.setStyleSheet("background-color: #5a5a5a;")
+        buttons.addWidget(self.check_button)
+        buttons.addWidget(self.import_button)
+        buttons.addWidget(self.close_button)
+
+        layout.addWidget(hint)
+        layout.addLayout(file_layout)
+        layout.addWidget(self.summary)
+        layout.addWidget(rejects_view)
+        layout.addWidget(self.progress)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.browse_button.clicked.connect(self.browse)
+        self.path.textChanged.connect(lambda: self.import_button.setEnabled(False))
+        self.check_button.clicked.connect(lambda: self.run_import(merge=False))
+        self.import_button.clicked.connect(lambda: self.run_import(merge=True))
+        self.close_button.clicked.connect(self.reject)
+
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Выберите файл", "", "CSV (*.csv);;Все файлы (*)")
+        if path:
+            self.path.setText(path)
+
+    def run_import(self, merge):
+        path = self.path.text()
+        if not path:
+            QMessageBox.warning(self, "Ошибка", "Выберите файл")
+            return
+
+        self.set_busy(True)
+        self.job = Job(lambda job: self.db.import_csv(self.table, self.columns, path, merge),
+                       f"{self.table.split('.')[-1]}/import")
+        self.job.signals.finished.connect(lambda result: self.on_imported(result, merge))
+        self.job.signals.failed.connect(self.on_import_failed)
+        self.db.submit(self.job)
+
+    def set_busy(self, busy):
+        self.progress.setVisible(busy)
+        for button in (self.browse_button, self.check_button, self.import_button, self.close_button):
+            button.setEnabled(not busy)
+
+    def on_imported(self, result, merge):
+        self.job = None
+        self.set_busy(False)
+        self.rejects.set_rows(result['rejects'])
+        valid = result['total'] - len(result['rejects'])
+
+        if merge:
+            QMessageBox.information(self, "Успех", f"Импортировано записей: {result['imported']}")
+            self.accept()
+            return
+
+        self.summary.setText(
+            f"Строк в файле: {result['total']}, готово к импорту: {valid}, "
+            f"отклонено: {len(result['rejects'])}"
+        )
+        self.import_button.setEnabled(valid > 0)
+
+    def on_import_failed(self, message):
+        self.job = None
+        self.set_busy(False)
+        self.import_button.setEnabled(False)
+        QMessageBox.warning(self, "Ошибка", f"Не удалось импортировать файл: {message}")
+
+
+class BulkUpdateDialog(QDialog):
+    def __init__(self, fields, count, parent=None):
+        super().__init__(parent)
+        self.fields = fields
+        self.setWindowTitle("Изменить выбранные")
+
+        form_layout = QFormLayout()
+        self.field = QComboBox()
+        self.field.addItems([label for name, label, choices in fields])
+        self.value = QComboBox()
+
+        buttons = QHBoxLayout()
+        self.apply_button = QPushButton("Применить")
+        self.apply_button.setStyleSheet("background-color: #2a82da;")
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.setStyleSheet("background-color: #5a5a5a;")
+        buttons.addWidget(self.apply_button)
+        buttons.addWidget(self.cancel_button)
+
+        form_layout.addRow(QLabel(f"Выбрано записей: {count}"))
+        form_layout.addRow("Поле:", self.field)
+        form_layout.addRow("Значение:", self.value)
+        form_layout.addRow(buttons)
+        self.setLayout(form_layout)
+
+        self.field.currentIndexChanged.connect(self.update_choices)
+        self.apply_button.clicked.connect(self.accept)
+        self.cancel_button.clicked.connect(self.reject)
+        self.update_choices(0)
+
+    def update_choices(self, index):
+        name, label, choices = self.fields[index]
+        self.value.clear()
+        self.value.setEditable(choices is None)
+        if choices:
+            self.value.addItems(choices)
+
+    def selected(self):
+        name, label, choices = self.fields[self.field.currentIndex()]
+        return name, self.value.currentText() or None
+
 
 class BaseTab(QWidget):
+    row_changed = pyqtSignal(str, str, int)
+
+    key_column = None
+    source_alias = None
+    columns = []
+    import_columns = []
+    bulk_fields = []
+    search_fields = []
+    page_size = 500
+
     def __init__(self, db, user):
         super().__init__()
         self.db = db
         self.user = user
+        self.record = record_type(f"{type(self).__name__}Record", [column.name for column in self.columns])
+        self.reference_columns = {
+            col: column.reference for col, column in enumerate(self.columns) if column.reference
+        }
+        self.interned_columns = [col for col, column in enumerate(self.columns) if column.interned]
+        self.hidden_columns = {
+            col for col, column in enumerate(self.columns)
+            if column.roles is not None and user['role'] not in column.roles
+        }
         self.current_id = None
+        self.page_state = ('first', None)
+        self.page_first_id = None
+        self.page_last_id = None
+        self.has_prev = False
+        self.has_next = False
+        self.jobs = set()
+        self.load_job = None
+        self.single_row = False
+        self.base_query = None
+        self.remote_changes = {}
+        self.remote_timer = QTimer(self)
+        self.remote_timer.setSingleShot(True)
+        self.remote_timer.setInterval(200)
+        self.remote_timer.timeout.connect(self.apply_remote_changes)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.apply_search)
         self.init_ui()
 
     def init_ui(self):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
-    def setup_common_ui(self, table_columns):
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(table_columns))
-        self.table.setHorizontalHeaderLabels(table_columns)
+    @property
+    def select_query(self):
+        return self.projection(self.hidden_columns)
+
+    def projection(self, hidden=()):
+        prefix = f"{self.source_alias}." if self.source_alias else ""
+        fields = ", ".join(
+            f"NULL AS {column.name}" if col in hidden else f"{prefix}{column.name}"
+            for col, column in enumerate(self.columns)
+        )
+        source = f"{{source}} {self.source_alias}" if self.source_alias else "{source}"
+        return f"SELECT {fields} FROM {source}"
+
+    def setup_common_ui(self):
+        table_columns = [column.header for column in self.columns] + ["Действия"]
+        self.model = TableModel(table_columns)
+        self.actions_column = len(table_columns) - 1
+
+        self.proxy = TableProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.actions_delegate = ActionsDelegate(self.row_actions, self.table)
+        self.actions_delegate.action_triggered.connect(self.on_row_action, Qt.QueuedConnection)
+        self.table.setItemDelegateForColumn(self.actions_column, self.actions_delegate)
+        self.table.verticalHeader().setDefaultSectionSize(ActionsDelegate.row_height)
+        self.table.horizontalHeader().setSectionResizeMode(self.actions_column, QHeaderView.Fixed)
+        self.table.horizontalHeader().resizeSection(
+            self.actions_column, self.actions_delegate.preferred_width(self.table.fontMetrics()))
+        for col in self.hidden_columns:
+            self.table.setColumnHidden(col, True)
+        self.table.horizontalHeader().setContextMenuPolicy(Qt.CustomContextMenu)
+        self.table.horizontalHeader().customContextMenuRequested.connect(self.show_columns_menu)
+
+        self.pager_widget = QWidget()
+        pager_layout = QHBoxLayout()
+        pager_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.prev_page_button = QPushButton("◀ Назад")
+        self.next_page_button = QPushButton("Вперёд ▶")
+        self.page_label = QLabel()
+        self.jump_id = QLineEdit(placeholderText="ID")
+        self.jump_id.setValidator(QIntValidator(1, 2147483647))
+        self.jump_id.setMaximumWidth(120)
+        self.jump_button = QPushButton("Перейти")
+
+        pager_layout.addWidget(self.prev_page_button)
+        pager_layout.addWidget(self.page_label)
+        pager_layout.addWidget(self.next_page_button)
+        pager_layout.addStretch()
+        pager_layout.addWidget(self.jump_id)
+        pager_layout.addWidget(self.jump_button)
+        self.pager_widget.setLayout(pager_layout)
+
+        self.tools_widget = QWidget()
+        tools_layout = QHBoxLayout()
+        tools_layout.setContentsMargins(0, 0, 0, 0)
+        tools_layout.addWidget(self.pager_widget, stretch=1)
+        self.quick_filter = QLineEdit(placeholderText="Фильтр по загруженным")
+        self.quick_filter.setClearButtonEnabled(True)
+        self.quick_filter.setMaximumWidth(220)
+        self.quick_filter.textChanged.connect(self.proxy.setFilterFixedString)
+        tools_layout.addWidget(self.quick_filter)
+        if self.import_columns and self.user['role'] == 'organizer':
+            self.import_button = QPushButton("Импорт CSV")
+            self.import_button.clicked.connect(self.show_import)
+            tools_layout.addWidget(self.import_button)
+        self.bulk_update_button = QPushButton("Изменить выбранные")
+        self.bulk_update_button.clicked.connect(self.bulk_update)
+        self.bulk_delete_button = QPushButton("Удалить выбранные")
+        self.bulk_delete_button.setStyleSheet("background-color: #e74c3c;")
+        self.bulk_delete_button.clicked.connect(self.bulk_delete)
+        tools_layout.addWidget(self.bulk_update_button)
+        tools_layout.addWidget(self.bulk_delete_button)
+        self.table.selectionModel().selectionChanged.connect(self.update_bulk_buttons)
+        self.model.modelReset.connect(self.update_bulk_buttons)
+        self.update_bulk_buttons()
+        self.export_button = QPushButton("Экспорт CSV")
+        self.export_button.clicked.connect(self.export_csv)
+        tools_layout.addWidget(self.export_button)
+        self.tools_widget.setLayout(tools_layout)
+
+        self.prev_page_button.clicked.connect(self.prev_page)
+        self.next_page_button.clicked.connect(self.next_page)
+        self.jump_button.clicked.connect(self.jump_to_id)
+        self.jump_id.returnPressed.connect(self.jump_to_id)
+
+        self.busy_widget = QWidget()
+        busy_layout = QHBoxLayout()
+        busy_layout.setContentsMargins(0, 0, 0, 0)
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.setMaximumHeight(12)
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.setStyleSheet("background-color: #5a5a5a;")
+        busy_layout.addWidget(self.busy_bar)
+        busy_layout.addWidget(self.cancel_button)
+        self.busy_widget.setLayout(busy_layout)
+        self.busy_widget.hide()
+        self.cancel_button.clicked.connect(self.cancel_jobs)
 
         self.form_group = QGroupBox("Добавить/Изменить")
         self.form_group.setVisible(self.user['role'] == 'organizer')
@@ -411,10 +2003,472 @@ class BaseTab(QWidget):
         self.buttons_widget.setLayout(buttons_layout)
         self.buttons_widget.setVisible(self.user['role'] == 'organizer')
 
+        self.setup_search()
+
+        self.layout.addWidget(self.search_widget)
         self.layout.addWidget(self.table)
+        self.layout.addWidget(self.busy_widget)
+        self.layout.addWidget(self.tools_widget)
         self.layout.addWidget(self.form_group)
         self.layout.addWidget(self.buttons_widget)
 
+    def show_columns_menu(self, pos):
+        menu = QMenu(self)
+        for col, column in enumerate(self.columns[1:], start=1):
+            action = menu.addAction(column.header)
+            action.setCheckable(True)
+            action.setChecked(col not in self.hidden_columns)
+            action.toggled.connect(lambda checked, col=col: self.set_column_visible(col, checked))
+        menu.exec_(self.table.horizontalHeader().mapToGlobal(pos))
+
+    def set_column_visible(self, col, visible):
+        if visible == (col not in self.hidden_columns):
+            return
+        self.table.setColumnHidden(col, not visible)
+        if visible:
+            self.hidden_columns.discard(col)
+            self.load_data()
+        else:
+            self.hidden_columns.add(col)
+
+    def with_full_record(self, row, callback):
+        if not self.hidden_columns:
+            callback(row)
+            return
+        row_id = self.model.value(row, 0)
+        sql = self.where(self.projection().format(source=self.table_name), [f"{self.key_column} = %s"])
+
+        def done(rows):
+            if not rows:
+                return
+            self.model.update_row(row_id, rows[0])
+            position = self.model.find_row(row_id)
+            if position is not None:
+                callback(position)
+
+        self.run_job(lambda job: self.fetch(sql, (row_id,)), on_done=done, action="record")
+
+    def setup_search(self):
+        self.search_widget = QWidget()
+        search_layout = QHBoxLayout()
+        search_layout.setContentsMargins(0, 0, 0, 0)
+        self.search_inputs = []
+
+        for kind, columns, label, choices in self.search_fields:
+            if kind == 'text':
+                widget = QLineEdit(placeholderText=label)
+                widget.setClearButtonEnabled(True)
+                widget.textChanged.connect(self.search_timer.start)
+                search_layout.addWidget(widget, stretch=2)
+            elif kind == 'choice':
+                widget = QComboBox()
+                widget.addItems([f"{label}: все"] + choices)
+                widget.currentIndexChanged.connect(self.search_timer.start)
+                search_layout.addWidget(widget, stretch=1)
+            else:
+                widget = []
+                search_layout.addWidget(QLabel(f"{label}:"))
+                for special in ("с", "по"):
+                    date = QDateEdit(calendarPopup=True)
+                    date.setDisplayFormat("dd.MM.yyyy")
+                    date.setMinimumDate(QDate(1900, 1, 1))
+                    date.setSpecialValueText(special)
+                    date.setDate(date.minimumDate())
+                    date.dateChanged.connect(self.search_timer.start)
+                    search_layout.addWidget(date)
+                    widget.append(date)
+            self.search_inputs.append(widget)
+
+        self.reset_search_button = QPushButton("Сбросить")
+        self.reset_search_button.setStyleSheet("background-color: #5a5a5a;")
+        self.reset_search_button.clicked.connect(self.reset_search)
+        search_layout.addWidget(self.reset_search_button)
+        self.search_widget.setLayout(search_layout)
+        self.search_widget.setVisible(bool(self.search_fields))
+
+    def filter_conditions(self):
+        conditions = []
+        params = []
+        for (kind, columns, label, choices), widget in zip(self.search_fields, self.search_inputs):
+            if kind == 'text':
+                term = widget.text().strip()
+                if term:
+                    pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                    conditions.append("(" + " OR ".join(f"{column} ILIKE %s" for column in columns) + ")")
+                    params.extend([pattern] * len(columns))
+            elif kind == 'choice':
+                if widget.currentIndex() > 0:
+                    conditions.append(f"{columns[0]} = %s")
+                    params.append(widget.currentText())
+            else:
+                for date, op in zip(widget, (">=", "<=")):
+                    if date.date() != date.minimumDate():
+                        conditions.append(f"{columns[0]} {op} %s")
+                        params.append(date.date().toString("yyyy-MM-dd"))
+        return conditions, tuple(params)
+
+    def apply_search(self):
+        self.page_state = ('first', None)
+        self.load_data()
+
+    def reset_search(self):
+        for (kind, columns, label, choices), widget in zip(self.search_fields, self.search_inputs):
+            if kind == 'text':
+                widget.clear()
+            elif kind == 'choice':
+                widget.setCurrentIndex(0)
+            else:
+                for date in widget:
+                    date.setDate(date.minimumDate())
+
+    def selected_rows(self):
+        return sorted(source_row(index) for index in self.table.selectionModel().selectedRows())
+
+    def selected_ids(self, action):
+        rows = self.selected_rows()
+        if not rows or not all(action in self.row_actions(row) for row in rows):
+            return []
+        return [self.model.value(row, 0) for row in rows]
+
+    def update_bulk_buttons(self):
+        rows = self.selected_rows()
+        allowed = [set(self.row_actions(row)) for row in rows]
+        self.bulk_update_button.setVisible(
+            bool(self.bulk_fields) and len(rows) > 1 and all('edit' in actions for actions in allowed))
+        self.bulk_delete_button.setVisible(
+            len(rows) > 1 and all('delete' in actions for actions in allowed))
+
+    def bulk_delete(self):
+        ids = self.selected_ids('delete')
+        if not ids:
+            return
+
+        reply = QMessageBox.question(
+            self, 'Подтверждение',
+            f'Вы уверены, что хотите удалить выбранные записи ({len(ids)})?',
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+
+        if reply == QMessageBox.Yes:
+            key = self.key_column.split(".")[-1]
+            query = f"DELETE FROM {self.table_name} WHERE {key} = ANY(%s)"
+            self.submit_change(query, (ids,), f"Удалено записей: {len(ids)}")
+
+    def bulk_update(self):
+        ids = self.selected_ids('edit')
+        if not ids or not self.bulk_fields:
+            return
+
+        dialog = BulkUpdateDialog(self.bulk_fields, len(ids), self)
+        if not dialog.exec_():
+            return
+
+        field, value = dialog.selected()
+        key = self.key_column.split(".")[-1]
+        query = f"UPDATE {self.table_name} SET {field} = %s WHERE {key} = ANY(%s)"
+        self.submit_change(query, (value, ids), f"Обновлено записей: {len(ids)}")
+
+    def export_csv(self):
+        if self.base_query is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить как", f"{self.table_name.split('.')[-1]}.csv", "CSV (*.csv)")
+        if not path:
+            return
+
+        query, params = self.base_query
+        visible = [col for col in range(len(self.columns)) if col not in self.hidden_columns]
+        fields = [f"q.{self.columns[col].name}" for col in visible] + [
+            self.db.references.label_sql(self.reference_columns[col], "q")
+            for col in visible if col in self.reference_columns
+        ]
+        sql = f"SELECT {', '.join(fields)} FROM ({query}) q ORDER BY 1"
+
+        self.run_job(
+            lambda job: self.db.export_csv(
+                sql, params, path, lambda rows, total: job.signals.batch.emit((rows, total))),
+            on_done=lambda total: QMessageBox.information(
+                self, "Успех", f"Экспортировано записей: {total}"),
+            on_batch=self.export_progress,
+            action="export"
+        )
+
+    def export_progress(self, progress):
+        rows, total = progress
+        self.busy_bar.setRange(0, max(total, 1))
+        self.busy_bar.setValue(rows)
+
+    def show_import(self):
+        dialog = ImportDialog(self.db, self.table_name, self.import_columns, self)
+        if dialog.exec_():
+            self.load_data()
+
+    def run_job(self, fn, on_done=None, on_batch=None, action="query"):
+        job = Job(fn, f"{self.table_name.split('.')[-1]}/{action}")
+        if on_batch is not None:
+            job.signals.batch.connect(on_batch)
+        job.signals.finished.connect(lambda result: self.finish_job(job, result, on_done))
+        job.signals.failed.connect(lambda message: self.fail_job(job, message))
+        self.jobs.add(job)
+        self.busy_widget.show()
+        return self.db.submit(job)
+
+    def finish_job(self, job, result, on_done):
+        self.jobs.discard(job)
+        self.update_busy()
+        if not job.cancelled and on_done is not None:
+            on_done(result)
+
+    def fail_job(self, job, message):
+        self.jobs.discard(job)
+        self.update_busy()
+        if not job.cancelled:
+            QMessageBox.warning(self, "Ошибка", f"Ошибка выполнения запроса: {message}")
+
+    def update_busy(self):
+        self.busy_widget.setVisible(bool(self.jobs))
+        if not self.jobs:
+            self.busy_bar.setRange(0, 0)
+
+    def cancel_jobs(self):
+        for job in list(self.jobs):
+            job.cancel(self.db)
+
+    def submit_change(self, query, params, success_message):
+        action = query.split(None, 1)[0].upper()
+        select = self.select_query
+
+        def change(job):
+            rows = self.db.change(self.table_name, query, params, select)
+            return False if rows is False else self.make_records(rows)
+
+        def done(rows):
+            if rows is False:
+                return
+            for row in rows:
+                self.patch_row(action, row)
+            QMessageBox.information(self, "Успех", success_message)
+            self.clear_form()
+
+        self.run_job(change, on_done=done, action=action.lower())
+
+    def patch_row(self, action, row):
+        if action == 'DELETE':
+            self.model.delete_row(row[0])
+        elif not self.model.update_row(row[0], row):
+            if action == 'INSERT' and not self.single_row and not self.has_next:
+                self.model.append_rows([row])
+        self.refresh_page_bounds()
+        self.row_changed.emit(self.table_name.split(".")[-1], action, row[0])
+
+    def on_remote_change(self, table, action, row_id):
+        if f"sportsorganizations.{table}" != self.table_name:
+            return
+        if action == 'DELETE':
+            self.remote_changes.pop(row_id, None)
+            self.patch_row(action, (row_id,))
+            return
+        if self.remote_changes.get(row_id) != 'INSERT':
+            self.remote_changes[row_id] = action
+        self.remote_timer.start()
+
+    def apply_remote_changes(self):
+        changes, self.remote_changes = self.remote_changes, {}
+        if not changes:
+            return
+        query = self.select_query.format(source=self.table_name)
+        conditions, params = self.filter_conditions()
+        sql = f"{self.where(query, conditions + [f'{self.key_column} = ANY(%s)'])} ORDER BY {self.key_column}"
+
+        def done(rows):
+            if rows is False:
+                return
+            for row in rows:
+                self.patch_row(changes[row[0]], row)
+            for row_id in set(changes) - {row[0] for row in rows}:
+                if self.model.delete_row(row_id):
+                    self.refresh_page_bounds()
+
+        self.run_job(lambda job: self.fetch(sql, params + (list(changes),)), on_done=done,
+                     action="refresh")
+
+    def refresh_page_bounds(self):
+        if self.single_row:
+            return
+        self.page_first_id = self.model.first_value(0)
+        self.page_last_id = self.model.last_value(0)
+        self.update_pager()
+
+    def start_load(self, sql, params, on_done, probe=None):
+        if self.load_job is not None:
+            self.load_job.cancel(self.db)
+        self.model.clear()
+
+        def on_batch(rows):
+            if job is self.load_job:
+                self.model.append_rows(rows)
+
+        def done(info):
+            if job is self.load_job:
+                self.load_job = None
+                on_done(info)
+
+        job = self.load_job = self.run_job(
+            lambda job: self.fetch_rows(job, sql, params, probe), on_done=done, on_batch=on_batch,
+            action="load")
+
+    def fetch_rows(self, job, sql, params, probe=None):
+        info = {'count': 0, 'first_id': None, 'last_id': None, 'has_next': False, 'has_prev': False}
+        page = []
+        rows = self.db.stream(sql, params, replicated=True, prepared=True)
+        try:
+            for row in rows:
+                if job.cancelled:
+                    break
+                if len(page) == self.page_size:
+                    info['has_next'] = True
+                    break
+                page.append(row)
+        finally:
+            rows.close()
+        if page:
+            info.update(count=len(page), first_id=page[0][0], last_id=page[-1][0])
+        for start in range(0, len(page), TableModel.batch_size):
+            if job.cancelled:
+                break
+            job.signals.batch.emit(self.make_records(page[start:start + TableModel.batch_size]))
+        if probe is not None and info['first_id'] is not None and not job.cancelled:
+            probe_sql, probe_params = probe
+            info['has_prev'] = bool(self.db.execute(
+                probe_sql, probe_params + (info['first_id'],), fetch=True, replicated=True))
+        return info
+
+    def fetch(self, sql, params):
+        rows = self.db.execute(sql, params, fetch=True, replicated=True)
+        if rows is False:
+            return False
+        return self.make_records(rows)
+
+    def make_records(self, rows):
+        rows = [list(row) for row in rows]
+        for col, entity in self.reference_columns.items():
+            ids = [row[col] for row in rows if row[col] is not None]
+            labels = self.db.references.resolve(entity, ids) if ids else {}
+            for row in rows:
+                if row[col] is not None:
+                    row[col] = Reference(entity, row[col], labels.get(row[col]))
+        for row in rows:
+            for col in self.interned_columns:
+                if isinstance(row[col], str):
+                    row[col] = sys.intern(row[col])
+        return [self.record._make(row) for row in rows]
+
+    def refresh_reference(self, entity, row_id):
+        columns = [col for col, col_entity in self.reference_columns.items() if col_entity == entity]
+        if not columns or not self.model.references_to(columns, row_id):
+            return
+
+        def done(labels):
+            self.model.relabel(columns, row_id, labels.get(row_id))
+
+        self.run_job(lambda job: self.db.references.resolve(entity, [row_id]), on_done=done,
+                     action="reference")
+
+    def load_row(self, query, row_id):
+        self.single_row = True
+        self.base_query = (self.where(query, [f"{self.key_column} = %s"]), (row_id,))
+        self.pager_widget.hide()
+        self.search_widget.hide()
+        self.start_load(*self.base_query, lambda info: None)
+
+    def load_page(self, query, params=()):
+        direction, anchor = self.page_state
+        key = self.key_column
+        conditions, filter_params = self.filter_conditions()
+        params = tuple(params) + filter_params
+        self.base_query = (self.where(query, conditions), params)
+        probe = None
+
+        if direction == 'first':
+            sql = f"{self.where(query, conditions)} ORDER BY {key} LIMIT %s"
+            params = params + (self.page_size + 1,)
+        elif direction == 'prev':
+            page = self.where(query, conditions + [f"{key} < %s"])
+            sql = f"SELECT * FROM ({page} ORDER BY {key} DESC LIMIT %s) page ORDER BY 1"
+            params = params + (anchor, self.page_size)
+        else:
+            op = '>' if direction == 'next' else '>='
+            sql = f"{self.where(query, conditions + [f'{key} {op} %s'])} ORDER BY {key} LIMIT %s"
+            params = params + (anchor, self.page_size + 1)
+        if direction != 'first':
+            probe = (f"{self.where(query, conditions + [f'{key} < %s'])} ORDER BY {key} DESC LIMIT 1",
+                     self.base_query[1])
+
+        self.single_row = False
+        self.pager_widget.show()
+        self.search_widget.setVisible(bool(self.search_fields))
+        self.prev_page_button.setEnabled(False)
+        self.next_page_button.setEnabled(False)
+        self.page_label.setText("Загрузка...")
+        self.start_load(sql, params, lambda info: self.page_loaded(direction, info), probe)
+
+    def where(self, query, conditions):
+        if not conditions:
+            return query
+        return f"{query} WHERE {' AND '.join(conditions)}"
+
+    def page_loaded(self, direction, info):
+        if direction == 'prev' and info['count'] < self.page_size:
+            self.show_page('first')
+            return
+
+        self.page_first_id = info['first_id']
+        self.page_last_id = info['last_id']
+        self.has_prev = info['has_prev']
+        self.has_next = info['has_next'] or direction == 'prev'
+        if direction != 'first' and self.page_first_id is not None:
+            self.page_state = ('jump', self.page_first_id)
+        self.update_pager()
+
+    def update_pager(self):
+        self.prev_page_button.setEnabled(self.has_prev)
+        self.next_page_button.setEnabled(self.has_next)
+        if self.page_first_id is None:
+            self.page_label.setText("Нет записей")
+        else:
+            self.page_label.setText(f"ID {self.page_first_id} – {self.page_last_id}")
+
+    def show_page(self, direction, anchor=None):
+        self.page_state = (direction, anchor)
+        self.load_data()
+
+    def prev_page(self):
+        if self.page_first_id is not None:
+            self.show_page('prev', self.page_first_id)
+
+    def next_page(self):
+        if self.has_next:
+            self.show_page('next', self.page_last_id)
+
+    def jump_to_id(self):
+        if not self.jump_id.text():
+            self.show_page('first')
+            return
+        self.show_page('jump', int(self.jump_id.text()))
+
+    def row_actions(self, row):
+        if self.user['role'] == 'organizer':
+            return ['edit', 'delete']
+        return []
+
+    def on_row_action(self, action, row):
+        if row >= self.model.rowCount():
+            return
+        if action == 'edit':
+            self.with_full_record(row, self.edit_row)
+        elif action == 'delete':
+            self.delete_row(row)
+
     def toggle_edit_mode(self, edit_mode):
         if hasattr(self, 'add_button'):
             self.add_button.setEnabled(not edit_mode)
@@ -424,23 +2478,48 @@ class BaseTab(QWidget):
             self.delete_button.setEnabled(edit_mode)
 
     def clear_form(self):
-        for widget in self.findChildren(QLineEdit):
+        for widget in self.form_group.findChildren(QLineEdit):
             widget.clear()
-        for widget in self.findChildren(QComboBox):
+        for widget in self.form_group.findChildren(QComboBox):
             widget.setCurrentIndex(0)
-        for widget in self.findChildren(QDateEdit):
+        for widget in self.form_group.findChildren(QDateEdit):
             widget.setDate(QDate.currentDate())
         self.current_id = None
         self.toggle_edit_mode(False)
 
 
 class AthletesTab(BaseTab):
+    key_column = "id_athlete"
+    table_name = "sportsorganizations.athletes"
+    columns = [
+        Column("id_athlete", "ID"),
+        Column("firstname", "Имя"),
+        Column("lastname", "Фамилия"),
+        Column("gender", "Пол", interned=True),
+        Column("phone_number", "Телефон", roles=('organizer', 'athlete')),
+        Column("birth_date", "Дата рождения"),
+        Column("sport_rank", "Разряд", interned=True),
+        Column("sport_type", "Вид спорта", interned=True)
+    ]
+    search_fields = [
+        ('text', ["firstname", "lastname"], "Имя или фамилия", None),
+        ('text', ["sport_type"], "Вид спорта", None),
+        ('text', ["sport_rank"], "Разряд", None),
+        ('date_range', ["birth_date"], "Дата рождения", None)
+    ]
+    bulk_fields = [
+        ("sport_rank", "Разряд", None),
+        ("sport_type", "Вид спорта", None)
+    ]
+    import_columns = [
+        ("firstname", "required"), ("lastname", "required"), ("gender", "gender"),
+        ("phone_number", "text"), ("birth_date", "date"), ("sport_rank", "text"),
+        ("sport_type", "text")
+    ]
+
     def init_ui(self):
         super().init_ui()
-        self.setup_common_ui([
-            "ID", "Имя", "Фамилия", "Пол", "Телефон",
-            "Дата рождения", "Разряд", "Вид спорта", "Действия"
-        ])
+        self.setup_common_ui()
 
         form_layout = QFormLayout()
 
@@ -483,71 +2562,24 @@ class AthletesTab(BaseTab):
         self.update_button.clicked.connect(self.update_athlete)
         self.delete_button.clicked.connect(self.delete_athlete_by_id)
         self.clear_button.clicked.connect(self.clear_form)
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(
+            lambda index: self.on_table_double_click(source_row(index), index.column()))
 
         if self.user['role'] == 'athlete':
             self.load_data(only_current_user=True)
-            self.setup_athlete_edit_mode()
         else:
             self.load_data()
 
-    def setup_athlete_edit_mode(self):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item and int(item.text()) == self.user['id']:
-                for col in range(self.table.columnCount()):
-                    if self.table.cellWidget(row, col):
-                        self.table.removeCellWidget(row, col)
-                break
-
     def on_table_double_click(self, row, col):
         if self.user['role'] != 'organizer':
             return
 
     def load_data(self, only_current_user=False):
+        query = self.select_query.format(source=self.table_name)
         if only_current_user or self.user['role'] == 'athlete':
-            query = """
-            SELECT id_athlete, firstname, lastname, gender, phone_number, 
-                   birth_date, sport_rank, sport_type
-            FROM sportsorganizations.athletes 
-            WHERE id_athlete = %s
-            """
-            params = (self.user['id'],)
+            self.load_row(query, self.user['id'])
         else:
-            query = """
-            SELECT id_athlete, firstname, lastname, gender, phone_number, 
-                   birth_date, sport_rank, sport_type
-            FROM sportsorganizations.athletes
-            """
-            params = None
-
-        result = self.db.execute(query, params, fetch=True)
-        if result:
-            self.table.setRowCount(len(result))
-            for row_idx, row in enumerate(result):
-                for col_idx, value in enumerate(row):
-                    if col_idx == 5:
-                        value = value.strftime("%d.%m.%Y") if value else ""
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    self.table.setItem(row_idx, col_idx, item)
-
-                if self.user['role'] == 'organizer':
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout()
-                    actions_layout.setContentsMargins(0, 0, 0, 0)
-
-                    edit_btn = QPushButton("Изменить")
-                    edit_btn.clicked.connect(lambda _, r=row_idx: self.edit_athlete(r, 0))
-
-                    delete_btn = QPushButton("Удалить")
-                    delete_btn.setStyleSheet("background-color: #e74c3c;")
-                    delete_btn.clicked.connect(lambda _, r=row_idx: self.delete_row(r))
-
-                    actions_layout.addWidget(edit_btn)
-                    actions_layout.addWidget(delete_btn)
-                    actions_widget.setLayout(actions_layout)
-
-                    self.table.setCellWidget(row_idx, 8, actions_widget)
+            self.load_page(query)
 
     def add_athlete(self):
         query = """
@@ -565,30 +2597,25 @@ class AthletesTab(BaseTab):
             self.sport_type.text() if self.sport_type.text() else None
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Спортсмен добавлен")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Спортсмен добавлен")
 
     def edit_athlete(self, row, col):
-        self.current_id = int(self.table.item(row, 0).text())
+        record = self.model.record(row)
+        self.current_id = record.id_athlete
 
-        self.firstname.setText(self.table.item(row, 1).text())
-        self.lastname.setText(self.table.item(row, 2).text())
+        self.firstname.setText(format_cell(record.firstname))
+        self.lastname.setText(format_cell(record.lastname))
 
-        gender = self.table.item(row, 3).text()
-        index = self.gender.findText(gender)
+        index = self.gender.findText(format_cell(record.gender))
         self.gender.setCurrentIndex(index if index != -1 else 0)
 
-        self.phone.setText(self.table.item(row, 4).text())
+        self.phone.setText(format_cell(record.phone_number))
 
-        birthdate = self.table.item(row, 5).text()
-        if birthdate:
-            date = QDate.fromString(birthdate, "dd.MM.yyyy")
-            self.birthdate.setDate(date)
+        if record.birth_date:
+            self.birthdate.setDate(QDate(record.birth_date))
 
-        self.rank.setText(self.table.item(row, 6).text())
-        self.sport_type.setText(self.table.item(row, 7).text())
+        self.rank.setText(format_cell(record.sport_rank))
+        self.sport_type.setText(format_cell(record.sport_type))
 
         self.toggle_edit_mode(True)
 
@@ -613,14 +2640,13 @@ class AthletesTab(BaseTab):
             self.current_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Данные обновлены")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Данные обновлены")
+
+    def edit_row(self, row):
+        self.edit_athlete(row, 0)
 
     def delete_row(self, row):
-        athlete_id = int(self.table.item(row, 0).text())
-        self.delete_athlete_by_id(athlete_id)
+        self.delete_athlete_by_id(self.model.record(row).id_athlete)
 
     def delete_athlete_by_id(self, athlete_id):
         reply = QMessageBox.question(
@@ -631,19 +2657,41 @@ class AthletesTab(BaseTab):
 
         if reply == QMessageBox.Yes:
             query = "DELETE FROM sportsorganizations.athletes WHERE id_athlete = %s"
-            if self.db.execute(query, (athlete_id,)):
-                QMessageBox.information(self, "Успех", "Спортсмен удален")
-                self.load_data()
-                self.clear_form()
+            self.submit_change(query, (athlete_id,), "Спортсмен удален")
 
 
 class TrainersTab(BaseTab):
+    key_column = "id_trainer"
+    table_name = "sportsorganizations.trainers"
+    columns = [
+        Column("id_trainer", "ID"),
+        Column("firstname", "Имя"),
+        Column("lastname", "Фамилия"),
+        Column("phone_number", "Телефон", roles=('organizer', 'trainer')),
+        Column("sport_type", "Вид спорта", interned=True),
+        Column("category", "Категория", interned=True),
+        Column("birth_date", "Дата рождения")
+    ]
+    sport_types = ["Футбол", "Хоккей", "Баскетбол", "Плавание", "Другой"]
+    categories = ["1 категория", "2 категория", "Высшая категория"]
+    bulk_fields = [
+        ("sport_type", "Вид спорта", sport_types),
+        ("category", "Категория", categories)
+    ]
+    search_fields = [
+        ('text', ["firstname", "lastname"], "Имя или фамилия", None),
+        ('choice', ["sport_type"], "Вид спорта", sport_types),
+        ('choice', ["category"], "Категория", categories),
+        ('date_range', ["birth_date"], "Дата рождения", None)
+    ]
+    import_columns = [
+        ("firstname", "required"), ("lastname", "required"), ("phone_number", "text"),
+        ("sport_type", "text"), ("category", "text"), ("birth_date", "date")
+    ]
+
     def init_ui(self):
         super().init_ui()
-        self.setup_common_ui([
-            "ID", "Имя", "Фамилия", "Телефон", "Вид спорта",
-            "Категория", "Дата рождения", "Действия"
-        ])
+        self.setup_common_ui()
 
         form_layout = QFormLayout()
 
@@ -651,9 +2699,9 @@ class TrainersTab(BaseTab):
         self.lastname = QLineEdit()
         self.phone = QLineEdit()
         self.sport_type = QComboBox()
-        self.sport_type.addItems(["Футбол", "Хоккей", "Баскетбол", "Плавание", "Другой"])
+        self.sport_type.addItems(self.sport_types)
         self.category = QComboBox()
-        self.category.addItems(["1 категория", "2 категория", "Высшая категория"])
+        self.category.addItems(self.categories)
         self.birthdate = QDateEdit(calendarPopup=True)
         self.birthdate.setDisplayFormat("dd.MM.yyyy")
 
@@ -685,71 +2733,24 @@ class TrainersTab(BaseTab):
         self.update_button.clicked.connect(self.update_trainer)
         self.delete_button.clicked.connect(self.delete_trainer_by_id)
         self.clear_button.clicked.connect(self.clear_form)
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(
+            lambda index: self.on_table_double_click(source_row(index), index.column()))
 
         if self.user['role'] == 'trainer':
             self.load_data(only_current_user=True)
-            self.setup_trainer_edit_mode()
         else:
             self.load_data()
 
-    def setup_trainer_edit_mode(self):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item and int(item.text()) == self.user['id']:
-                for col in range(self.table.columnCount()):
-                    if self.table.cellWidget(row, col):
-                        self.table.removeCellWidget(row, col)
-                break
-
     def on_table_double_click(self, row, col):
         if self.user['role'] != 'organizer':
             return
 
     def load_data(self, only_current_user=False):
+        query = self.select_query.format(source=self.table_name)
         if only_current_user or self.user['role'] == 'trainer':
-            query = """
-            SELECT id_trainer, firstname, lastname, phone_number, 
-                   sport_type, category, birth_date
-            FROM sportsorganizations.trainers 
-            WHERE id_trainer = %s
-            """
-            params = (self.user['id'],)
+            self.load_row(query, self.user['id'])
         else:
-            query = """
-            SELECT id_trainer, firstname, lastname, phone_number, 
-                   sport_type, category, birth_date
-            FROM sportsorganizations.trainers
-            """
-            params = None
-
-        result = self.db.execute(query, params, fetch=True)
-        if result:
-            self.table.setRowCount(len(result))
-            for row_idx, row in enumerate(result):
-                for col_idx, value in enumerate(row):
-                    if col_idx == 6:
-                        value = value.strftime("%d.%m.%Y") if value else ""
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    self.table.setItem(row_idx, col_idx, item)
-
-                if self.user['role'] == 'organizer':
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout()
-                    actions_layout.setContentsMargins(0, 0, 0, 0)
-
-                    edit_btn = QPushButton("Изменить")
-                    edit_btn.clicked.connect(lambda _, r=row_idx: self.edit_trainer(r, 0))
-
-                    delete_btn = QPushButton("Удалить")
-                    delete_btn.setStyleSheet("background-color: #e74c3c;")
-                    delete_btn.clicked.connect(lambda _, r=row_idx: self.delete_row(r))
-
-                    actions_layout.addWidget(edit_btn)
-                    actions_layout.addWidget(delete_btn)
-                    actions_widget.setLayout(actions_layout)
-
-                    self.table.setCellWidget(row_idx, 7, actions_widget)
+            self.load_page(query)
 
     def add_trainer(self):
         query = """
@@ -766,30 +2767,24 @@ class TrainersTab(BaseTab):
             self.birthdate.date().toString("yyyy-MM-dd")
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Тренер добавлен")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Тренер добавлен")
 
     def edit_trainer(self, row, col):
-        self.current_id = int(self.table.item(row, 0).text())
+        record = self.model.record(row)
+        self.current_id = record.id_trainer
 
-        self.firstname.setText(self.table.item(row, 1).text())
-        self.lastname.setText(self.table.item(row, 2).text())
-        self.phone.setText(self.table.item(row, 3).text())
+        self.firstname.setText(format_cell(record.firstname))
+        self.lastname.setText(format_cell(record.lastname))
+        self.phone.setText(format_cell(record.phone_number))
 
-        sport_type = self.table.item(row, 4).text()
-        index = self.sport_type.findText(sport_type)
+        index = self.sport_type.findText(format_cell(record.sport_type))
         self.sport_type.setCurrentIndex(index if index != -1 else 0)
 
-        category = self.table.item(row, 5).text()
-        index = self.category.findText(category)
+        index = self.category.findText(format_cell(record.category))
         self.category.setCurrentIndex(index if index != -1 else 0)
 
-        birthdate = self.table.item(row, 6).text()
-        if birthdate:
-            date = QDate.fromString(birthdate, "dd.MM.yyyy")
-            self.birthdate.setDate(date)
+        if record.birth_date:
+            self.birthdate.setDate(QDate(record.birth_date))
 
         self.toggle_edit_mode(True)
 
@@ -813,14 +2808,13 @@ class TrainersTab(BaseTab):
             self.current_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Данные тренера обновлены")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Данные тренера обновлены")
+
+    def edit_row(self, row):
+        self.edit_trainer(row, 0)
 
     def delete_row(self, row):
-        trainer_id = int(self.table.item(row, 0).text())
-        self.delete_trainer_by_id(trainer_id)
+        self.delete_trainer_by_id(self.model.record(row).id_trainer)
 
     def delete_trainer_by_id(self, trainer_id):
         reply = QMessageBox.question(
@@ -831,19 +2825,41 @@ class TrainersTab(BaseTab):
 
         if reply == QMessageBox.Yes:
             query = "DELETE FROM sportsorganizations.trainers WHERE id_trainer = %s"
-            if self.db.execute(query, (trainer_id,)):
-                QMessageBox.information(self, "Успех", "Тренер удален")
-                self.load_data()
-                self.clear_form()
+            self.submit_change(query, (trainer_id,), "Тренер удален")
 
 
 class JudgesTab(BaseTab):
+    key_column = "j.id_judge"
+    table_name = "sportsorganizations.judges"
+    source_alias = "j"
+    columns = [
+        Column("id_judge", "ID"),
+        Column("firstname", "Имя"),
+        Column("lastname", "Фамилия"),
+        Column("phone_number", "Телефон", roles=('organizer', 'judge')),
+        Column("category", "Категория", interned=True),
+        Column("birth_date", "Дата рождения"),
+        Column("id_athlete", "Спортсмен", reference='athlete'),
+        Column("id_medal", "Медаль", reference='medal')
+    ]
+    categories = ["Национальная", "Международная", "Главный судья"]
+    bulk_fields = [
+        ("category", "Категория", categories)
+    ]
+    search_fields = [
+        ('text', ["j.firstname", "j.lastname"], "Имя или фамилия", None),
+        ('choice', ["j.category"], "Категория", categories),
+        ('date_range', ["j.birth_date"], "Дата рождения", None)
+    ]
+    import_columns = [
+        ("firstname", "required"), ("lastname", "required"), ("phone_number", "text"),
+        ("category", "text"), ("birth_date", "date"), ("id_athlete", "reference"),
+        ("id_medal", "reference")
+    ]
+
     def init_ui(self):
         super().init_ui()
-        self.setup_common_ui([
-            "ID", "Имя", "Фамилия", "Телефон", "Категория",
-            "Дата рождения", "Спортсмен", "Медаль", "Действия"
-        ])
+        self.setup_common_ui()
 
         form_layout = QFormLayout()
 
@@ -851,7 +2867,7 @@ class JudgesTab(BaseTab):
         self.lastname = QLineEdit()
         self.phone = QLineEdit()
         self.category = QComboBox()
-        self.category.addItems(["Национальная", "Международная", "Главный судья"])
+        self.category.addItems(self.categories)
         self.birthdate = QDateEdit(calendarPopup=True)
         self.birthdate.setDisplayFormat("dd.MM.yyyy")
         self.athlete_id = QLineEdit()
@@ -886,79 +2902,24 @@ class JudgesTab(BaseTab):
         self.update_button.clicked.connect(self.update_judge)
         self.delete_button.clicked.connect(self.delete_judge_by_id)
         self.clear_button.clicked.connect(self.clear_form)
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(
+            lambda index: self.on_table_double_click(source_row(index), index.column()))
 
         if self.user['role'] == 'judge':
             self.load_data(only_current_user=True)
-            self.setup_judge_edit_mode()
         else:
             self.load_data()
 
-    def setup_judge_edit_mode(self):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item and int(item.text()) == self.user['id']:
-                for col in range(self.table.columnCount()):
-                    if self.table.cellWidget(row, col):
-                        self.table.removeCellWidget(row, col)
-                break
-
     def on_table_double_click(self, row, col):
         if self.user['role'] != 'organizer':
             return
 
     def load_data(self, only_current_user=False):
+        query = self.select_query.format(source=self.table_name)
         if only_current_user or self.user['role'] == 'judge':
-            query = """
-            SELECT j.id_judge, j.firstname, j.lastname, j.phone_number, 
-                   j.category, j.birth_date, 
-                   a.firstname || ' ' || a.lastname as athlete,
-                   m.material || ' (' || m.color || ')' as medal
-            FROM sportsorganizations.judges j
-            LEFT JOIN sportsorganizations.athletes a ON j.id_athlete = a.id_athlete
-            LEFT JOIN sportsorganizations.medals m ON j.id_medal = m.id_medal
-            WHERE j.id_judge = %s
-            """
-            params = (self.user['id'],)
+            self.load_row(query, self.user['id'])
         else:
-            query = """
-            SELECT j.id_judge, j.firstname, j.lastname, j.phone_number, 
-                   j.category, j.birth_date, 
-                   a.firstname || ' ' || a.lastname as athlete,
-                   m.material || ' (' || m.color || ')' as medal
-            FROM sportsorganizations.judges j
-            LEFT JOIN sportsorganizations.athletes a ON j.id_athlete = a.id_athlete
-            LEFT JOIN sportsorganizations.medals m ON j.id_medal = m.id_medal
-            """
-            params = None
-
-        result = self.db.execute(query, params, fetch=True)
-        if result:
-            self.table.setRowCount(len(result))
-            for row_idx, row in enumerate(result):
-                for col_idx, value in enumerate(row):
-                    if col_idx == 5:
-                        value = value.strftime("%d.%m.%Y") if value else ""
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    self.table.setItem(row_idx, col_idx, item)
-
-                if self.user['role'] == 'organizer':
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout()
-                    actions_layout.setContentsMargins(0, 0, 0, 0)
-
-                    edit_btn = QPushButton("Изменить")
-                    edit_btn.clicked.connect(lambda _, r=row_idx: self.edit_judge(r, 0))
-
-                    delete_btn = QPushButton("Удалить")
-                    delete_btn.setStyleSheet("background-color: #e74c3c;")
-                    delete_btn.clicked.connect(lambda _, r=row_idx: self.delete_row(r))
-
-                    actions_layout.addWidget(edit_btn)
-                    actions_layout.addWidget(delete_btn)
-                    actions_widget.setLayout(actions_layout)
-
-                    self.table.setCellWidget(row_idx, 8, actions_widget)
+            self.load_page(query)
 
     def add_judge(self):
         query = """
@@ -983,26 +2944,24 @@ class JudgesTab(BaseTab):
             medal_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Судья добавлен")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Судья добавлен")
 
     def edit_judge(self, row, col):
-        self.current_id = int(self.table.item(row, 0).text())
+        record = self.model.record(row)
+        self.current_id = record.id_judge
 
-        self.firstname.setText(self.table.item(row, 1).text())
-        self.lastname.setText(self.table.item(row, 2).text())
-        self.phone.setText(self.table.item(row, 3).text())
+        self.firstname.setText(format_cell(record.firstname))
+        self.lastname.setText(format_cell(record.lastname))
+        self.phone.setText(format_cell(record.phone_number))
 
-        category = self.table.item(row, 4).text()
-        index = self.category.findText(category)
+        index = self.category.findText(format_cell(record.category))
         self.category.setCurrentIndex(index if index != -1 else 0)
 
-        birthdate = self.table.item(row, 5).text()
-        if birthdate:
-            date = QDate.fromString(birthdate, "dd.MM.yyyy")
-            self.birthdate.setDate(date)
+        if record.birth_date:
+            self.birthdate.setDate(QDate(record.birth_date))
+
+        self.athlete_id.setText(str(record.id_athlete.id) if record.id_athlete else "")
+        self.medal_id.setText(str(record.id_medal.id) if record.id_medal else "")
 
         self.toggle_edit_mode(True)
 
@@ -1034,14 +2993,13 @@ class JudgesTab(BaseTab):
             self.current_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Данные судьи обновлены")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Данные судьи обновлены")
+
+    def edit_row(self, row):
+        self.edit_judge(row, 0)
 
     def delete_row(self, row):
-        judge_id = int(self.table.item(row, 0).text())
-        self.delete_judge_by_id(judge_id)
+        self.delete_judge_by_id(self.model.record(row).id_judge)
 
     def delete_judge_by_id(self, judge_id):
         reply = QMessageBox.question(
@@ -1052,18 +3010,30 @@ class JudgesTab(BaseTab):
 
         if reply == QMessageBox.Yes:
             query = "DELETE FROM sportsorganizations.judges WHERE id_judge = %s"
-            if self.db.execute(query, (judge_id,)):
-                QMessageBox.information(self, "Успех", "Судья удален")
-                self.load_data()
-                self.clear_form()
+            self.submit_change(query, (judge_id,), "Судья удален")
 
 class OrganizersTab(BaseTab):
+    key_column = "o.id_organizer"
+    table_name = "sportsorganizations.organizers"
+    source_alias = "o"
+    columns = [
+        Column("id_organizer", "ID"),
+        Column("firstname", "Имя"),
+        Column("lastname", "Фамилия"),
+        Column("phone_number", "Телефон"),
+        Column("email", "Email"),
+        Column("birth_date", "Дата рождения"),
+        Column("id_venue", "Место", reference='venue'),
+        Column("id_inventory", "Инвентарь", reference='inventory')
+    ]
+    search_fields = [
+        ('text', ["o.firstname", "o.lastname"], "Имя или фамилия", None),
+        ('text', ["o.email"], "Email", None)
+    ]
+
     def init_ui(self):
         super().init_ui()
-        self.setup_common_ui([
-            "ID", "Имя", "Фамилия", "Телефон", "Email",
-            "Дата рождения", "Место", "Инвентарь", "Действия"
-        ])
+        self.setup_common_ui()
 
         form_layout = QFormLayout()
 
@@ -1105,91 +3075,29 @@ class OrganizersTab(BaseTab):
         self.update_button.clicked.connect(self.update_organizer)
         self.delete_button.clicked.connect(self.delete_organizer_by_id)
         self.clear_button.clicked.connect(self.clear_form)
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(
+            lambda index: self.on_table_double_click(source_row(index), index.column()))
 
         if self.user['role'] == 'organizer':
             self.load_data(only_current_user=True)
-            self.setup_organizer_edit_mode()
         else:
             self.load_data()
 
-    def setup_organizer_edit_mode(self):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item and int(item.text()) == self.user['id']:
-                edit_btn = QPushButton("Изменить")
-                edit_btn.clicked.connect(lambda _, r=row: self.edit_organizer(r, 0))
-
-                for col in range(self.table.columnCount()):
-                    if self.table.cellWidget(row, col):
-                        self.table.removeCellWidget(row, col)
-
-                actions_widget = QWidget()
-                actions_layout = QHBoxLayout()
-                actions_layout.setContentsMargins(0, 0, 0, 0)
-                actions_layout.addWidget(edit_btn)
-                actions_widget.setLayout(actions_layout)
-                self.table.setCellWidget(row, 8, actions_widget)
-                break
-
     def on_table_double_click(self, row, col):
-        if self.user['role'] == 'organizer':
-            item = self.table.item(row, 0)
-            if item and int(item.text()) == self.user['id']:
-                self.edit_organizer(row, col)
+        if self.user['role'] == 'organizer' and self.model.value(row, 0) == self.user['id']:
+            self.with_full_record(row, self.edit_row)
+
+    def row_actions(self, row):
+        if self.user['role'] == 'organizer' and self.model.value(row, 0) == self.user['id']:
+            return ['edit']
+        return []
 
     def load_data(self, only_current_user=False):
+        query = self.select_query.format(source=self.table_name)
         if only_current_user or self.user['role'] == 'organizer':
-            query = """
-            SELECT o.id_organizer, o.firstname, o.lastname, o.phone_number, 
-                   o.email, o.birth_date, 
-                   v.name as venue, 
-                   i.product_name as inventory
-            FROM sportsorganizations.organizers o
-            LEFT JOIN sportsorganizations.venues v ON o.id_venue = v.id_venue
-            LEFT JOIN sportsorganizations.sports_inventories i ON o.id_inventory = i.id_inventory
-            WHERE o.id_organizer = %s
-            """
-            params = (self.user['id'],)
+            self.load_row(query, self.user['id'])
         else:
-            query = """
-            SELECT o.id_organizer, o.firstname, o.lastname, o.phone_number, 
-                   o.email, o.birth_date, 
-                   v.name as venue, 
-                   i.product_name as inventory
-            FROM sportsorganizations.organizers o
-            LEFT JOIN sportsorganizations.venues v ON o.id_venue = v.id_venue
-            LEFT JOIN sportsorganizations.sports_inventories i ON o.id_inventory = i.id_inventory
-            """
-            params = None
-
-        result = self.db.execute(query, params, fetch=True)
-        if result:
-            self.table.setRowCount(len(result))
-            for row_idx, row in enumerate(result):
-                for col_idx, value in enumerate(row):
-                    if col_idx == 5:
-                        value = value.strftime("%d.%m.%Y") if value else ""
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    self.table.setItem(row_idx, col_idx, item)
-
-                if self.user['role'] == 'organizer':
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout()
-                    actions_layout.setContentsMargins(0, 0, 0, 0)
-
-                    edit_btn = QPushButton("Изменить")
-                    edit_btn.clicked.connect(lambda _, r=row_idx: self.edit_organizer(r, 0))
-
-                    delete_btn = QPushButton("Удалить")
-                    delete_btn.setStyleSheet("background-color: #e74c3c;")
-                    delete_btn.clicked.connect(lambda _, r=row_idx: self.delete_row(r))
-
-                    actions_layout.addWidget(edit_btn)
-                    actions_layout.addWidget(delete_btn)
-                    actions_widget.setLayout(actions_layout)
-
-                    self.table.setCellWidget(row_idx, 8, actions_widget)
+            self.load_page(query)
 
     def add_organizer(self):
         query = """
@@ -1205,26 +3113,22 @@ class OrganizersTab(BaseTab):
             self.birthdate.date().toString("yyyy-MM-dd")
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Организатор добавлен")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Организатор добавлен")
 
     def edit_organizer(self, row, col):
-        self.current_id = int(self.table.item(row, 0).text())
+        record = self.model.record(row)
+        self.current_id = record.id_organizer
 
-        self.firstname.setText(self.table.item(row, 1).text())
-        self.lastname.setText(self.table.item(row, 2).text())
-        self.phone.setText(self.table.item(row, 3).text())
-        self.email.setText(self.table.item(row, 4).text())
+        self.firstname.setText(format_cell(record.firstname))
+        self.lastname.setText(format_cell(record.lastname))
+        self.phone.setText(format_cell(record.phone_number))
+        self.email.setText(format_cell(record.email))
 
-        birthdate = self.table.item(row, 5).text()
-        if birthdate:
-            date = QDate.fromString(birthdate, "dd.MM.yyyy")
-            self.birthdate.setDate(date)
+        if record.birth_date:
+            self.birthdate.setDate(QDate(record.birth_date))
 
-        self.venue.setText(self.table.item(row, 6).text())
-        self.inventory.setText(self.table.item(row, 7).text())
+        self.venue.setText(format_cell(record.id_venue))
+        self.inventory.setText(format_cell(record.id_inventory))
 
         self.toggle_edit_mode(True)
 
@@ -1247,14 +3151,13 @@ class OrganizersTab(BaseTab):
             self.current_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Данные организатора обновлены")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Данные организатора обновлены")
+
+    def edit_row(self, row):
+        self.edit_organizer(row, 0)
 
     def delete_row(self, row):
-        organizer_id = int(self.table.item(row, 0).text())
-        self.delete_organizer_by_id(organizer_id)
+        self.delete_organizer_by_id(self.model.record(row).id_organizer)
 
     def delete_organizer_by_id(self, organizer_id):
         reply = QMessageBox.question(
@@ -1265,23 +3168,37 @@ class OrganizersTab(BaseTab):
 
         if reply == QMessageBox.Yes:
             query = "DELETE FROM sportsorganizations.organizers WHERE id_organizer = %s"
-            if self.db.execute(query, (organizer_id,)):
-                QMessageBox.information(self, "Успех", "Организатор удален")
-                self.load_data()
-                self.clear_form()
+            self.submit_change(query, (organizer_id,), "Организатор удален")
 
 
 class MedalsTab(BaseTab):
+    key_column = "id_medal"
+    table_name = "sportsorganizations.medals"
+    columns = [
+        Column("id_medal", "ID"),
+        Column("material", "Материал", interned=True),
+        Column("color", "Цвет", interned=True),
+        Column("weight", "Вес (г)"),
+        Column("quantity", "Количество")
+    ]
+    materials = ["Золото", "Серебро", "Бронза", "Другой"]
+    bulk_fields = [
+        ("material", "Материал", materials),
+        ("color", "Цвет", None)
+    ]
+    search_fields = [
+        ('choice', ["material"], "Материал", materials),
+        ('text', ["color"], "Цвет", None)
+    ]
+
     def init_ui(self):
         super().init_ui()
-        self.setup_common_ui([
-            "ID", "Материал", "Цвет", "Вес (г)", "Количество", "Действия"
-        ])
+        self.setup_common_ui()
 
         form_layout = QFormLayout()
 
         self.material = QComboBox()
-        self.material.addItems(["Золото", "Серебро", "Бронза", "Другой"])
+        self.material.addItems(self.materials)
         self.color = QLineEdit()
         self.weight = QLineEdit()
         self.quantity = QLineEdit()
@@ -1312,7 +3229,8 @@ class MedalsTab(BaseTab):
         self.update_button.clicked.connect(self.update_medal)
         self.delete_button.clicked.connect(self.delete_medal_by_id)
         self.clear_button.clicked.connect(self.clear_form)
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(
+            lambda index: self.on_table_double_click(source_row(index), index.column()))
 
         if self.user['role'] not in ['judge', 'organizer']:
             self.form_group.hide()
@@ -1323,39 +3241,16 @@ class MedalsTab(BaseTab):
 
     def on_table_double_click(self, row, col):
         if self.user['role'] in ['judge', 'organizer']:
-            self.edit_medal(row, col)
-
-    def load_data(self):
-        query = """
-        SELECT id_medal, material, color, weight, quantity
-        FROM sportsorganizations.medals
-        """
-        result = self.db.execute(query, fetch=True)
+            self.with_full_record(row, self.edit_row)
 
-        if result:
-            self.table.setRowCount(len(result))
-            for row_idx, row in enumerate(result):
-                for col_idx, value in enumerate(row):
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    self.table.setItem(row_idx, col_idx, item)
-
-                if self.user['role'] in ['judge', 'organizer']:
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout()
-                    actions_layout.setContentsMargins(0, 0, 0, 0)
-
-                    edit_btn = QPushButton("Изменить")
-                    edit_btn.clicked.connect(lambda _, r=row_idx: self.edit_medal(r, 0))
-
-                    delete_btn = QPushButton("Удалить")
-                    delete_btn.setStyleSheet("background-color: #e74c3c;")
-                    delete_btn.clicked.connect(lambda _, r=row_idx: self.delete_row(r))
-
-                    actions_layout.addWidget(edit_btn)
-                    actions_layout.addWidget(delete_btn)
-                    actions_widget.setLayout(actions_layout)
+    def row_actions(self, row):
+        if self.user['role'] in ['judge', 'organizer']:
+            return ['edit', 'delete']
+        return []
 
-                    self.table.setCellWidget(row_idx, 5, actions_widget)
+    def load_data(self):
+        query = self.select_query.format(source=self.table_name)
+        self.load_page(query)
 
     def add_medal(self):
         query = """
@@ -1377,21 +3272,18 @@ class MedalsTab(BaseTab):
             quantity
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Медаль добавлена")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Медаль добавлена")
 
     def edit_medal(self, row, col):
-        self.current_id = int(self.table.item(row, 0).text())
+        record = self.model.record(row)
+        self.current_id = record.id_medal
 
-        material = self.table.item(row, 1).text()
-        index = self.material.findText(material)
+        index = self.material.findText(format_cell(record.material))
         self.material.setCurrentIndex(index if index != -1 else 0)
 
-        self.color.setText(self.table.item(row, 2).text())
-        self.weight.setText(self.table.item(row, 3).text())
-        self.quantity.setText(self.table.item(row, 4).text())
+        self.color.setText(format_cell(record.color))
+        self.weight.setText(format_cell(record.weight))
+        self.quantity.setText(format_cell(record.quantity))
 
         self.toggle_edit_mode(True)
 
@@ -1419,14 +3311,13 @@ class MedalsTab(BaseTab):
             self.current_id
         )
 
-        if self.db.execute(query, params):
-            QMessageBox.information(self, "Успех", "Данные медали обновлены")
-            self.load_data()
-            self.clear_form()
+        self.submit_change(query, params, "Данные медали обновлены")
+
+    def edit_row(self, row):
+        self.edit_medal(row, 0)
 
     def delete_row(self, row):
-        medal_id = int(self.table.item(row, 0).text())
-        self.delete_medal_by_id(medal_id)
+        self.delete_medal_by_id(self.model.record(row).id_medal)
 
     def delete_medal_by_id(self, medal_id):
         reply = QMessageBox.question(
@@ -1437,18 +3328,55 @@ class MedalsTab(BaseTab):
 
         if reply == QMessageBox.Yes:
             query = "DELETE FROM sportsorganizations.medals WHERE id_medal = %s"
-            if self.db.execute(query, (medal_id,)):
-                QMessageBox.information(self, "Успех", "Медаль удалена")
-                self.load_data()
-                self.clear_form()
+            self.submit_change(query, (medal_id,), "Медаль удалена")
+
+
+class LazyTab(QWidget):
+    built = pyqtSignal(object)
+
+    def __init__(self, factory, db, user):
+        super().__init__()
+        self.factory = factory
+        self.db = db
+        self.user = user
+        self.tab = None
+        self.layout = QVBoxLayout()
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.layout)
+
+    def ensure_built(self):
+        if self.tab is None:
+            self.tab = self.factory(self.db, self.user)
+            self.layout.addWidget(self.tab)
+            self.built.emit(self.tab)
+        return self.tab
+
+    def showEvent(self, event):
+        self.ensure_built()
+        super().showEvent(event)
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, db, user):
+    def __init__(self, db, user, settings=None):
         super().__init__()
         self.db = db
         self.user = user
+        self.settings = settings or load_settings("ui", DEFAULT_UI_SETTINGS, "SPORTS_")
+        self.feed = ChangeFeed(db, self)
+        self.sync = ReplicaSync(db, self) if db.replica is not None else None
+        self.changes = self.feed if self.sync is None else self.sync
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_next_tab)
         self.init_ui()
+        self.feed.restarted.connect(self.reconcile)
+        self.feed.start()
+        if self.sync is not None:
+            self.feed.changed.connect(self.sync.on_remote_change)
+            self.sync.reconciled.connect(self.reload_tabs)
+            self.sync.conflicted.connect(self.show_conflicts)
+            self.sync.status.connect(self.statusBar().showMessage)
+            self.sync.start()
 
     def init_ui(self):
         self.setWindowTitle(f"Спортивные организации ({self.user['role']})")
@@ -1456,31 +3384,114 @@ class MainWindow(QMainWindow):
 
         self.tabs = QTabWidget()
 
-        self.tabs.addTab(AthletesTab(self.db, self.user), "Спортсмены")
+        self.add_lazy_tab(AthletesTab, "Спортсмены")
 
         if self.user['role'] in ['trainer', 'organizer']:
-            self.tabs.addTab(TrainersTab(self.db, self.user), "Тренеры")
+            self.add_lazy_tab(TrainersTab, "Тренеры")
 
         if self.user['role'] in ['judge', 'organizer']:
-            self.tabs.addTab(JudgesTab(self.db, self.user), "Судьи")
-            self.tabs.addTab(MedalsTab(self.db, self.user), "Медали")
+            self.add_lazy_tab(JudgesTab, "Судьи")
+            self.add_lazy_tab(MedalsTab, "Медали")
 
         if self.user['role'] == 'organizer':
-            self.tabs.addTab(OrganizersTab(self.db, self.user), "Организаторы")
+            self.add_lazy_tab(OrganizersTab, "Организаторы")
+
+        self.changes.changed.connect(self.on_row_changed)
 
         self.setCentralWidget(self.tabs)
 
+    def add_lazy_tab(self, factory, title):
+        placeholder = LazyTab(factory, self.db, self.user)
+        placeholder.built.connect(self.on_tab_built)
+        self.tabs.addTab(placeholder, title)
+
+    def on_tab_built(self, tab):
+        self.changes.changed.connect(tab.on_remote_change)
+        tab.row_changed.connect(self.on_row_changed)
+        if setting_enabled(self.settings['prefetch_tabs']):
+            self.prefetch_timer.start(int(self.settings['prefetch_delay']))
+
+    def prefetch_next_tab(self):
+        if self.db.thread_pool.activeThreadCount():
+            self.prefetch_timer.start(int(self.settings['prefetch_delay']))
+            return
+        for index in range(self.tabs.count()):
+            placeholder = self.tabs.widget(index)
+            if placeholder.tab is None:
+                placeholder.ensure_built()
+                return
+
+    def built_tabs(self):
+        for index in range(self.tabs.count()):
+            tab = self.tabs.widget(index).tab
+            if tab is not None:
+                yield tab
+
+    def on_row_changed(self, table, action, row_id):
+        entity = self.db.references.invalidate(table, row_id)
+        if entity is None:
+            return
+        for tab in self.built_tabs():
+            tab.refresh_reference(entity, row_id)
+
+    def reconcile(self):
+        for table, _, _ in ReferenceCache.entities.values():
+            self.db.references.invalidate(table)
+        if self.sync is not None:
+            self.sync.sync(reconcile=True)
+        else:
+            self.reload_tabs()
+
+    def reload_tabs(self):
+        for tab in self.built_tabs():
+            tab.load_data()
+
+    def show_conflicts(self, conflicts):
+        QMessageBox.warning(self, "Конфликт изменений", "\n".join(conflicts))
+
+    def closeEvent(self, event):
+        self.prefetch_timer.stop()
+        self.feed.stop()
+        if self.sync is not None:
+            self.sync.stop()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
+    if "--migrate" in sys.argv[1:]:
+        db = Database(dict(load_db_settings(), migrate_on_start="no"))
+        if not db.connect():
+            sys.exit(1)
+        applied = db.migrate()
+        db.close()
+        if applied is False:
+            sys.exit(1)
+        print(f"Схема в актуальном состоянии (версия {migrations.LATEST_VERSION})")
+        sys.exit(0)
+
+    startup = StartupTimer(enabled=setting_enabled(
+        load_settings("ui", DEFAULT_UI_SETTINGS, "SPORTS_")['startup_report']))
+    startup.mark("импорт")
+
     app = QApplication(sys.argv)
     setup_style(app)
+    startup.mark("стиль")
 
     db = Database()
-    if not db.connect():
-        sys.exit(1)
+    app.aboutToQuit.connect(db.close)
+    atexit.register(db.stats.dump)
 
     auth = AuthWindow(db)
+    connect_job = Job(lambda job: db.connect(), "startup/connect")
+    connect_job.signals.finished.connect(lambda connected: startup.mark("подключение"))
+    connect_job.signals.finished.connect(auth.on_connected)
+    connect_job.signals.failed.connect(lambda message: auth.on_connected(False))
+    db.submit(connect_job)
+
+    QTimer.singleShot(0, lambda: startup.mark("окно входа"))
     if auth.exec_():
         window = MainWindow(db, auth.user)
         window.show()
         sys.exit(app.exec_())
+    db.close()
+    sys.exit(1 if auth.connection_failed else 0)
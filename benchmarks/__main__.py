@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import statistics
+from contextlib import redirect_stdout
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SPORTS_PREFETCH_TABS", "no")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QComboBox, QMessageBox
+import SportsOrganizationsApp as sports
+from benchmarks.seed import SCALES, BENCH_PASSWORD, is_empty, seed
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+BENCH_MARKER = "Бенчмарк"
+
+FORMS = {
+    'athletes': ({'firstname': "Иван", 'lastname': BENCH_MARKER, 'sport_type': "Плавание"}, 'lastname'),
+    'trainers': ({'firstname': "Иван", 'lastname': BENCH_MARKER, 'phone': "+70000000000"}, 'lastname'),
+    'judges': ({'firstname': "Иван", 'lastname': BENCH_MARKER, 'phone': "+70000000000",
+                'athlete_id': "1", 'medal_id': "1"}, 'lastname'),
+    'organizers': ({'firstname': "Иван", 'lastname': BENCH_MARKER, 'phone': "+70000000000",
+                    'email': "bench@example.com"}, 'lastname'),
+    'medals': ({'color': BENCH_MARKER, 'weight': "25.5", 'quantity': "3"}, 'color'),
+}
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def summary(runs):
+    return {
+        'median': round(statistics.median(runs), 3),
+        'min': round(min(runs), 3),
+        'max': round(max(runs), 3),
+        'runs': [round(run, 3) for run in runs]
+    } if runs else None
+
+
+def fill(tab, values):
+    for name, value in values.items():
+        widget = getattr(tab, name)
+        if isinstance(widget, QComboBox):
+            widget.setCurrentText(value)
+        else:
+            widget.setText(value)
+
+
+def tab_idle(tab):
+    return tab is not None and tab.load_job is None and not tab.jobs
+
+
+class Runner:
+    def __init__(self, app, db, repeat, timeout):
+        self.app = app
+        self.db = db
+        self.repeat = repeat
+        self.timeout = timeout
+        self.scenarios = []
+        self.warnings = []
+
+    def wait(self, condition):
+        deadline = time.perf_counter() + self.timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Превышено время ожидания")
+            self.app.processEvents()
+            time.sleep(0.0005)
+
+    def measure(self, name, action, done, prepare=None, render=None, first=None, repeat=None):
+        runs = []
+        first_runs = []
+        peak_before = peak_rss_kb()
+        started = time.perf_counter()
+        for _ in range(repeat or self.repeat):
+            if prepare is not None:
+                prepare()
+            shown = []
+
+            def on_first(*args):
+                if not shown:
+                    shown.append(time.perf_counter())
+
+            if first is not None:
+                first.connect(on_first)
+            clicked = time.perf_counter()
+            action()
+            self.wait(done)
+            if render is not None:
+                render()
+            runs.append((time.perf_counter() - clicked) * 1000)
+            if first is not None:
+                first.disconnect(on_first)
+                if shown:
+                    first_runs.append((shown[0] - clicked) * 1000)
+
+        result = {
+            'scenario': name,
+            'wall_ms': elapsed_ms(started),
+            'click_to_render_ms': summary(runs),
+            'peak_rss_kb_running': peak_rss_kb()
+        }
+        if peak_before is not None:
+            result['peak_rss_growth_kb'] = result['peak_rss_kb_running'] - peak_before
+        if first is not None:
+            result['first_rows_ms'] = summary(first_runs)
+        self.scenarios.append(result)
+        return result
+
+    def login(self, username, password):
+        auth = sports.AuthWindow(self.db)
+        auth.username.setText(username)
+        auth.password.setText(password)
+        self.measure("login", auth.login_btn.click, lambda: auth.login_job is None)
+        return auth.user
+
+    def open_tabs(self, window):
+        for index in range(window.tabs.count()):
+            placeholder = window.tabs.widget(index)
+            table = placeholder.factory.table_name.split(".")[-1]
+            if index == 0:
+                action = window.show
+            else:
+                action = lambda index=index: window.tabs.setCurrentIndex(index)
+            self.measure(f"open/{table}", action, lambda: tab_idle(placeholder.tab),
+                         render=window.repaint, repeat=1)
+
+    def load(self, tab, table):
+        result = self.measure(
+            f"load/{table}", tab.load_data, lambda: tab_idle(tab),
+            render=tab.table.viewport().repaint, first=tab.model.rowsInserted)
+        result['rows'] = tab.model.rowCount()
+
+    def crud(self, tab, table):
+        values, marker = FORMS[table]
+        render = tab.table.viewport().repaint
+
+        def prepare_add():
+            tab.clear_form()
+            fill(tab, values)
+
+        self.measure(f"add/{table}", tab.add_button.click, lambda: not tab.jobs,
+                     prepare=prepare_add, render=render)
+
+        ids = self.created_ids(tab, marker)
+        if not ids:
+            self.warnings.append(f"{table}: записи для изменения и удаления не созданы")
+            return
+        pending = iter(ids)
+
+        def prepare_update():
+            tab.clear_form()
+            fill(tab, dict(values, **{marker: f"{BENCH_MARKER} изменен"}))
+            tab.current_id = next(pending)
+            tab.toggle_edit_mode(True)
+
+        self.measure(f"update/{table}", tab.update_button.click, lambda: not tab.jobs,
+                     prepare=prepare_update, render=render, repeat=len(ids))
+
+        pending = iter(ids)
+        delete = getattr(tab, f"delete_{table[:-1]}_by_id")
+        self.measure(f"delete/{table}", lambda: delete(next(pending)), lambda: not tab.jobs,
+                     render=render, repeat=len(ids))
+
+    def created_ids(self, tab, marker):
+        key = tab.key_column.split(".")[-1]
+        rows = self.db.execute(
+            f"SELECT {key} FROM {tab.table_name} WHERE {marker} LIKE %s ORDER BY {key}",
+            (f"{BENCH_MARKER}%",), fetch=True)
+        return [row[0] for row in rows or []]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Замеры производительности SportsOrganizationsApp на синтетических данных")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="объем синтетических данных")
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name}", type=int, help=f"число записей ({name})")
+    parser.add_argument("--skip-seed", action="store_true",
+                        help="не заполнять базу, использовать имеющиеся данные")
+    parser.add_argument("--reset", action="store_true",
+                        help="очистить непустую базу перед заполнением")
+    parser.add_argument("--repeat", type=int, default=5, help="число повторов каждого сценария")
+    parser.add_argument("--timeout", type=float, default=120, help="ожидание одного действия (сек.)")
+    parser.add_argument("--output", help="файл для результатов в формате JSON")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    started = time.perf_counter()
+    app = QApplication(sys.argv[:1])
+    db = sports.Database()
+    runner = Runner(app, db, args.repeat, args.timeout)
+
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.Yes)
+    QMessageBox.warning = staticmethod(
+        lambda parent, title, text, *args, **kwargs: runner.warnings.append(text) or QMessageBox.Ok)
+
+    if not db.connect():
+        raise SystemExit("Не удалось подключиться к базе данных")
+
+    volumes = {
+        name: count if getattr(args, name) is None else getattr(args, name)
+        for name, count in SCALES[args.scale].items()
+    }
+    report = {
+        'started_at': datetime.datetime.now().isoformat(timespec="seconds"),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'volumes': volumes,
+        'seed': None
+    }
+
+    try:
+        if not args.skip_seed:
+            seed_started = time.perf_counter()
+            with db.connection() as conn, conn.cursor() as cursor:
+                if not args.reset and not is_empty(cursor):
+                    raise SystemExit("База данных не пуста: укажите --reset или --skip-seed")
+                rows = seed(cursor, volumes, sports.PasswordPolicy().hash(BENCH_PASSWORD),
+                            db.accounts_ready)
+            report['seed'] = {'wall_ms': elapsed_ms(seed_started), 'rows': rows}
+
+        user = runner.login("bench_organizer", BENCH_PASSWORD)
+        if user is None:
+            raise SystemExit("Не удалось войти под учетной записью bench_organizer")
+
+        window = sports.MainWindow(db, user)
+        runner.open_tabs(window)
+        for tab in list(window.built_tabs()):
+            table = tab.table_name.split(".")[-1]
+            runner.load(tab, table)
+            runner.crud(tab, table)
+        window.close()
+    finally:
+        db.close()
+
+    report.update(
+        wall_ms=elapsed_ms(started),
+        peak_rss_kb=peak_rss_kb(),
+        scenarios=runner.scenarios,
+        warnings=runner.warnings,
+        queries=db.stats.snapshot()
+    )
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with redirect_stdout(sys.stderr):
+        report = run(args)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as target:
+            target.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
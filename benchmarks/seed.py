@@ -0,0 +1,127 @@
+from migrations import ACCOUNT_LOGINS
+
+
+SCALES = {
+    'small': {
+        'athletes': 1000, 'trainers': 100, 'judges': 100, 'organizers': 20,
+        'medals': 50, 'venues': 20, 'inventories': 50
+    },
+    'medium': {
+        'athletes': 100000, 'trainers': 10000, 'judges': 10000, 'organizers': 1000,
+        'medals': 500, 'venues': 200, 'inventories': 500
+    },
+    'large': {
+        'athletes': 1000000, 'trainers': 100000, 'judges': 100000, 'organizers': 10000,
+        'medals': 1000, 'venues': 1000, 'inventories': 2000
+    },
+}
+
+BENCH_PASSWORD = "benchmark"
+
+SEEDED_TABLES = [
+    "judges", "organizers", "athletes", "trainers", "medals", "venues", "sports_inventories"
+]
+
+SEED_QUERIES = [
+    ('venues', """
+    INSERT INTO sportsorganizations.venues (name)
+    SELECT 'Площадка ' || n FROM generate_series(1, %(venues)s) n
+    """),
+    ('inventories', """
+    INSERT INTO sportsorganizations.sports_inventories (product_name)
+    SELECT 'Инвентарь ' || n FROM generate_series(1, %(inventories)s) n
+    """),
+    ('medals', """
+    INSERT INTO sportsorganizations.medals (material, color, weight, quantity)
+    SELECT (ARRAY['Золото', 'Серебро', 'Бронза', 'Другой'])[1 + n %% 4],
+           (ARRAY['Золотой', 'Серебряный', 'Бронзовый'])[1 + n %% 3],
+           10 + (n %% 490) / 10.0, 1 + n %% 100
+    FROM generate_series(1, %(medals)s) n
+    """),
+    ('athletes', """
+    INSERT INTO sportsorganizations.athletes
+    (username, passwordhash, firstname, lastname, gender, phone_number,
+     birth_date, sport_rank, sport_type)
+    SELECT CASE WHEN n = 1 THEN 'bench_athlete' END,
+           CASE WHEN n = 1 THEN %(password_hash)s END,
+           'Имя' || n, 'Фамилия' || n, (ARRAY['М', 'Ж'])[1 + n %% 2],
+           '+7' || lpad(n::text, 10, '0'), date '1970-01-01' + n %% 15000,
+           (ARRAY['КМС', 'МС', '1 разряд', '2 разряд'])[1 + n %% 4],
+           (ARRAY['Футбол', 'Хоккей', 'Баскетбол', 'Плавание', 'Другой'])[1 + n %% 5]
+    FROM generate_series(1, %(athletes)s) n
+    """),
+    ('trainers', """
+    INSERT INTO sportsorganizations.trainers
+    (username, passwordhash, firstname, lastname, phone_number, sport_type, category, birth_date)
+    SELECT CASE WHEN n = 1 THEN 'bench_trainer' END,
+           CASE WHEN n = 1 THEN %(password_hash)s END,
+           'Тренер' || n, 'Фамилия' || n, '+7' || lpad(n::text, 10, '0'),
+           (ARRAY['Футбол', 'Хоккей', 'Баскетбол', 'Плавание', 'Другой'])[1 + n %% 5],
+           (ARRAY['1 категория', '2 категория', 'Высшая категория'])[1 + n %% 3],
+           date '1960-01-01' + n %% 15000
+    FROM generate_series(1, %(trainers)s) n
+    """),
+    ('judges', """
+    INSERT INTO sportsorganizations.judges
+    (username, passwordhash, firstname, lastname, phone_number, category, birth_date,
+     id_athlete, id_medal)
+    SELECT CASE WHEN n = 1 THEN 'bench_judge' END,
+           CASE WHEN n = 1 THEN %(password_hash)s END,
+           'Судья' || n, 'Фамилия' || n, '+7' || lpad(n::text, 10, '0'),
+           (ARRAY['Национальная', 'Международная', 'Главный судья'])[1 + n %% 3],
+           date '1960-01-01' + n %% 15000,
+           CASE WHEN %(athletes)s > 0 THEN 1 + (n * 7919) %% %(athletes)s END,
+           CASE WHEN %(medals)s > 0 THEN 1 + n %% %(medals)s END
+    FROM generate_series(1, %(judges)s) n
+    """),
+    ('organizers', """
+    INSERT INTO sportsorganizations.organizers
+    (username, passwordhash, firstname, lastname, phone_number, email, birth_date,
+     id_venue, id_inventory)
+    SELECT CASE WHEN n = 1 THEN 'bench_organizer' END,
+           CASE WHEN n = 1 THEN %(password_hash)s END,
+           'Организатор' || n, 'Фамилия' || n, '+7' || lpad(n::text, 10, '0'),
+           'organizer' || n || '@example.com', date '1960-01-01' + n %% 15000,
+           CASE WHEN %(venues)s > 0 THEN 1 + n %% %(venues)s END,
+           CASE WHEN %(inventories)s > 0 THEN 1 + n %% %(inventories)s END
+    FROM generate_series(1, %(organizers)s) n
+    """),
+]
+
+
+def is_empty(cursor):
+    for table in SEEDED_TABLES:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM sportsorganizations.{table})")
+        if cursor.fetchone()[0]:
+            return False
+    return True
+
+
+def seed(cursor, volumes, password_hash, accounts=True):
+    tables = SEEDED_TABLES + ["accounts"] if accounts else SEEDED_TABLES
+    names = ", ".join(f"sportsorganizations.{table}" for table in tables)
+    cursor.execute("SET LOCAL statement_timeout = 0")
+    cursor.execute(f"TRUNCATE {names} RESTART IDENTITY CASCADE")
+
+    for table in SEEDED_TABLES:
+        cursor.execute(f"ALTER TABLE sportsorganizations.{table} DISABLE TRIGGER USER")
+
+    params = dict(volumes, password_hash=password_hash)
+    counts = {}
+    for name, query in SEED_QUERIES:
+        cursor.execute(query, params)
+        counts[name] = cursor.rowcount
+
+    if accounts:
+        cursor.execute(f"""
+        INSERT INTO sportsorganizations.accounts (username, role, user_id, passwordhash)
+        SELECT username, role, user_id, passwordhash FROM ({ACCOUNT_LOGINS}) logins
+        """)
+        counts['accounts'] = cursor.rowcount
+
+    for table in SEEDED_TABLES:
+        cursor.execute(f"ALTER TABLE sportsorganizations.{table} ENABLE TRIGGER USER")
+
+    for table in SEEDED_TABLES:
+        cursor.execute(f"ANALYZE sportsorganizations.{table}")
+    return counts
@@ -0,0 +1,404 @@
+SCHEMA_MIGRATIONS_DDL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = 'sportsorganizations') THEN
+        CREATE SCHEMA sportsorganizations;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.schema_migrations (
+    version integer PRIMARY KEY,
+    description text NOT NULL,
+    applied_at timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+LOCK_NAME = "sportsorganizations_migrations"
+
+SCHEMA_DDL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = 'sportsorganizations') THEN
+        CREATE SCHEMA sportsorganizations;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.venues (
+    id_venue serial PRIMARY KEY,
+    name text
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.sports_inventories (
+    id_inventory serial PRIMARY KEY,
+    product_name text
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.medals (
+    id_medal serial PRIMARY KEY,
+    material text,
+    color text,
+    weight numeric,
+    quantity integer
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.athletes (
+    id_athlete serial PRIMARY KEY,
+    username text,
+    passwordhash text,
+    firstname text,
+    lastname text,
+    gender text,
+    phone_number text,
+    birth_date date,
+    sport_rank text,
+    sport_type text
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.trainers (
+    id_trainer serial PRIMARY KEY,
+    username text,
+    passwordhash text,
+    firstname text,
+    lastname text,
+    phone_number text,
+    sport_type text,
+    category text,
+    birth_date date
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.judges (
+    id_judge serial PRIMARY KEY,
+    username text,
+    passwordhash text,
+    firstname text,
+    lastname text,
+    phone_number text,
+    category text,
+    birth_date date,
+    id_athlete integer REFERENCES sportsorganizations.athletes ON DELETE SET NULL,
+    id_medal integer REFERENCES sportsorganizations.medals ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS sportsorganizations.organizers (
+    id_organizer serial PRIMARY KEY,
+    username text,
+    passwordhash text,
+    firstname text,
+    lastname text,
+    phone_number text,
+    email text,
+    birth_date date,
+    id_venue integer REFERENCES sportsorganizations.venues ON DELETE SET NULL,
+    id_inventory integer REFERENCES sportsorganizations.sports_inventories ON DELETE SET NULL
+);
+"""
+
+ACCOUNT_LOGINS = """
+SELECT username, 'athlete' AS role, id_athlete AS user_id, passwordhash
+FROM sportsorganizations.athletes WHERE username IS NOT NULL
+UNION ALL
+SELECT username, 'trainer', id_trainer, passwordhash
+FROM sportsorganizations.trainers WHERE username IS NOT NULL
+UNION ALL
+SELECT username, 'judge', id_judge, passwordhash
+FROM sportsorganizations.judges WHERE username IS NOT NULL
+UNION ALL
+SELECT username, 'organizer', id_organizer, passwordhash
+FROM sportsorganizations.organizers WHERE username IS NOT NULL
+"""
+
+SYNC_ACCOUNT_FUNCTION = """
+CREATE OR REPLACE FUNCTION sportsorganizations.sync_account() RETURNS trigger AS $$
+DECLARE
+    row_id integer;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.username IS NOT NULL THEN
+        EXECUTE format('SELECT ($1).%I', TG_ARGV[1]) INTO row_id USING OLD;
+        DELETE FROM sportsorganizations.accounts
+        WHERE role = TG_ARGV[0] AND user_id = row_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.username IS NOT NULL THEN
+        EXECUTE format('SELECT ($1).%I', TG_ARGV[1]) INTO row_id USING NEW;
+        INSERT INTO sportsorganizations.accounts (username, role, user_id, passwordhash)
+        VALUES (NEW.username, TG_ARGV[0], row_id, NEW.passwordhash);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ACCOUNTS_DDL = f"""
+DO $$
+DECLARE
+    duplicates text;
+BEGIN
+    IF to_regclass('sportsorganizations.accounts') IS NULL THEN
+        SELECT string_agg(format('%s (%s)', username, owners), ', ' ORDER BY username) INTO duplicates
+        FROM (
+            SELECT username, string_agg(role || ' ' || user_id, ', ' ORDER BY role, user_id) AS owners
+            FROM ({ACCOUNT_LOGINS}) logins
+            GROUP BY username HAVING count(*) > 1
+        ) duplicated;
+        IF duplicates IS NOT NULL THEN
+            RAISE EXCEPTION 'Повторяющиеся логины, исправьте их перед миграцией: %', duplicates;
+        END IF;
+
+        CREATE TABLE sportsorganizations.accounts (
+            username text PRIMARY KEY,
+            role text NOT NULL,
+            user_id integer NOT NULL,
+            passwordhash text
+        );
+        INSERT INTO sportsorganizations.accounts (username, role, user_id, passwordhash)
+        SELECT username, role, user_id, passwordhash FROM ({ACCOUNT_LOGINS}) logins;
+    END IF;
+END
+$$;
+{SYNC_ACCOUNT_FUNCTION}
+DO $$
+DECLARE
+    spec text[];
+BEGIN
+    FOREACH spec SLICE 1 IN ARRAY ARRAY[
+        ['athletes', 'athlete', 'id_athlete'],
+        ['trainers', 'trainer', 'id_trainer'],
+        ['judges', 'judge', 'id_judge'],
+        ['organizers', 'organizer', 'id_organizer']
+    ] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = spec[1] || '_sync_account'
+              AND tgrelid = ('sportsorganizations.' || spec[1])::regclass
+        ) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR DELETE OR UPDATE OF username, passwordhash '
+                'ON sportsorganizations.%I FOR EACH ROW '
+                'EXECUTE PROCEDURE sportsorganizations.sync_account(%L, %L)',
+                spec[1] || '_sync_account', spec[1], spec[2], spec[3]
+            );
+        END IF;
+    END LOOP;
+END
+$$;
+"""
+
+ACCOUNTS_SYNC_DDL = f"""
+{SYNC_ACCOUNT_FUNCTION}
+CREATE INDEX IF NOT EXISTS accounts_role_user_id_idx ON sportsorganizations.accounts (role, user_id);
+
+DO $$
+DECLARE
+    missing text;
+BEGIN
+    SELECT string_agg(format('%s (%s %s)', logins.username, logins.role, logins.user_id), ', '
+                      ORDER BY logins.username) INTO missing
+    FROM ({ACCOUNT_LOGINS}) logins
+    WHERE NOT EXISTS (
+        SELECT 1 FROM sportsorganizations.accounts a
+        WHERE a.role = logins.role AND a.user_id = logins.user_id
+    );
+    IF missing IS NOT NULL THEN
+        RAISE EXCEPTION 'Нет учетных записей для повторяющихся логинов, исправьте их перед миграцией: %', missing;
+    END IF;
+END
+$$;
+"""
+
+CHANGES_DDL = """
+CREATE OR REPLACE FUNCTION sportsorganizations.notify_change() RETURNS trigger AS $$
+DECLARE
+    row_id integer;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        EXECUTE format('SELECT ($1).%I', TG_ARGV[0]) INTO row_id USING OLD;
+    ELSE
+        EXECUTE format('SELECT ($1).%I', TG_ARGV[0]) INTO row_id USING NEW;
+    END IF;
+    PERFORM pg_notify('sportsorganizations_changes',
+                      json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'id', row_id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    spec text[];
+BEGIN
+    FOREACH spec SLICE 1 IN ARRAY ARRAY[
+        ['athletes', 'id_athlete'],
+        ['trainers', 'id_trainer'],
+        ['judges', 'id_judge'],
+        ['organizers', 'id_organizer'],
+        ['medals', 'id_medal']
+    ] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = spec[1] || '_notify_change'
+              AND tgrelid = ('sportsorganizations.' || spec[1])::regclass
+        ) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE '
+                'ON sportsorganizations.%I FOR EACH ROW '
+                'EXECUTE PROCEDURE sportsorganizations.notify_change(%L)',
+                spec[1] || '_notify_change', spec[1], spec[2]
+            );
+        END IF;
+    END LOOP;
+END
+$$;
+"""
+
+LOOKUP_INDEXES_DDL = """
+DO $$
+DECLARE
+    spec text[];
+BEGIN
+    FOREACH spec SLICE 1 IN ARRAY ARRAY[
+        ['athletes', 'username'],
+        ['trainers', 'username'],
+        ['judges', 'username'],
+        ['organizers', 'username'],
+        ['judges', 'id_athlete'],
+        ['judges', 'id_medal'],
+        ['organizers', 'id_venue'],
+        ['organizers', 'id_inventory']
+    ] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = ('sportsorganizations.' || spec[1])::regclass
+              AND a.attname = spec[2]
+        ) THEN
+            EXECUTE format(
+                'CREATE INDEX %I ON sportsorganizations.%I (%I)',
+                spec[1] || '_' || spec[2] || '_idx', spec[1], spec[2]
+            );
+        END IF;
+    END LOOP;
+END
+$$;
+"""
+
+SEARCH_DDL = """
+DO $$
+DECLARE
+    spec text[];
+BEGIN
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN others THEN
+        RAISE NOTICE 'pg_trgm is not available: %', SQLERRM;
+    END;
+
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        FOREACH spec SLICE 1 IN ARRAY ARRAY[
+            ['athletes', 'firstname'], ['athletes', 'lastname'],
+            ['trainers', 'firstname'], ['trainers', 'lastname'],
+            ['judges', 'firstname'], ['judges', 'lastname'],
+            ['organizers', 'firstname'], ['organizers', 'lastname'],
+            ['organizers', 'email'], ['medals', 'color']
+        ] LOOP
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON sportsorganizations.%I USING gin (%I gin_trgm_ops)',
+                spec[1] || '_' || spec[2] || '_trgm', spec[1], spec[2]
+            );
+        END LOOP;
+    END IF;
+
+    FOREACH spec SLICE 1 IN ARRAY ARRAY[
+        ['athletes', 'sport_type'], ['athletes', 'sport_rank'], ['athletes', 'birth_date'],
+        ['trainers', 'sport_type'], ['trainers', 'category'], ['trainers', 'birth_date'],
+        ['judges', 'category'], ['judges', 'birth_date'],
+        ['medals', 'material']
+    ] LOOP
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON sportsorganizations.%I (%I)',
+            spec[1] || '_' || spec[2] || '_idx', spec[1], spec[2]
+        );
+    END LOOP;
+END
+$$;
+"""
+
+ATHLETE_SEARCH_DDL = """
+DO $$
+DECLARE
+    spec text[];
+BEGIN
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN others THEN
+        RAISE NOTICE 'pg_trgm is not available: %', SQLERRM;
+    END;
+
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        FOREACH spec SLICE 1 IN ARRAY ARRAY[
+            ['athletes', 'sport_type'], ['athletes', 'sport_rank']
+        ] LOOP
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON sportsorganizations.%I USING gin (%I gin_trgm_ops)',
+                spec[1] || '_' || spec[2] || '_trgm', spec[1], spec[2]
+            );
+        END LOOP;
+    END IF;
+END
+$$;
+"""
+
+MIGRATIONS = [
+    (1, "Базовая схема", SCHEMA_DDL),
+    (2, "Единая таблица учетных записей", ACCOUNTS_DDL),
+    (3, "Уведомления об изменениях", CHANGES_DDL),
+    (4, "Индексы по логинам и связям", LOOKUP_INDEXES_DDL),
+    (5, "Индексы для поиска", SEARCH_DDL),
+    (6, "Синхронизация учетных записей по ID", ACCOUNTS_SYNC_DDL),
+    (7, "Поиск спортсменов по части вида спорта и разряда", ATHLETE_SEARCH_DDL),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('sportsorganizations.schema_migrations')")
+        if cursor.fetchone()[0] is None:
+            return 0
+        cursor.execute("SELECT coalesce(max(version), 0) FROM sportsorganizations.schema_migrations")
+        return cursor.fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", (LOCK_NAME,))
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SCHEMA_MIGRATIONS_DDL)
+            cursor.execute("SELECT version FROM sportsorganizations.schema_migrations")
+            done = {version for version, in cursor.fetchall()}
+        conn.commit()
+
+        applied = []
+        for version, description, sql in MIGRATIONS:
+            if version > target or version in done:
+                continue
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql)
+                    cursor.execute(
+                        "INSERT INTO sportsorganizations.schema_migrations (version, description) "
+                        "VALUES (%s, %s)",
+                        (version, description)
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"Применена миграция {version}: {description}")
+            applied.append(version)
+        return applied
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_NAME,))
+        conn.commit()
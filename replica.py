@@ -0,0 +1,532 @@
+import re
+import json
+import sqlite3
+import datetime
+import threading
+from decimal import Decimal
+from functools import lru_cache
+from contextlib import contextmanager
+
+
+SCHEMA = "sportsorganizations"
+
+REPLICA_VERSION = 1
+
+TABLES = {
+    'venues': ("id_venue", [("name", "text")]),
+    'sports_inventories': ("id_inventory", [("product_name", "text")]),
+    'medals': ("id_medal", [
+        ("material", "text"), ("color", "text"), ("weight", "decimal"), ("quantity", "integer")
+    ]),
+    'athletes': ("id_athlete", [
+        ("firstname", "text"), ("lastname", "text"), ("gender", "text"), ("phone_number", "text"),
+        ("birth_date", "date"), ("sport_rank", "text"), ("sport_type", "text")
+    ]),
+    'trainers': ("id_trainer", [
+        ("firstname", "text"), ("lastname", "text"), ("phone_number", "text"),
+        ("sport_type", "text"), ("category", "text"), ("birth_date", "date")
+    ]),
+    'judges': ("id_judge", [
+        ("firstname", "text"), ("lastname", "text"), ("phone_number", "text"), ("category", "text"),
+        ("birth_date", "date"), ("id_athlete", "integer"), ("id_medal", "integer")
+    ]),
+    'organizers': ("id_organizer", [
+        ("firstname", "text"), ("lastname", "text"), ("phone_number", "text"), ("email", "text"),
+        ("birth_date", "date"), ("id_venue", "integer"), ("id_inventory", "integer")
+    ]),
+}
+
+REFERENCES = {
+    'athletes': [("judges", "id_athlete")],
+    'medals': [("judges", "id_medal")],
+    'venues': [("organizers", "id_venue")],
+    'sports_inventories': [("organizers", "id_inventory")],
+}
+
+QUEUE_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.pending_writes (
+        id integer PRIMARY KEY AUTOINCREMENT,
+        table_name text NOT NULL,
+        action text NOT NULL,
+        query text NOT NULL,
+        params text NOT NULL,
+        key_params text NOT NULL DEFAULT '[]',
+        row_ids text NOT NULL DEFAULT '[]',
+        base text NOT NULL DEFAULT '{{}}',
+        status text NOT NULL DEFAULT 'pending',
+        error text,
+        created_at text NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.sync_state (
+        table_name text PRIMARY KEY,
+        synced_at text NOT NULL
+    )
+    """,
+]
+
+ANY_PARAM = re.compile(r"=\s*ANY\(%s\)", re.IGNORECASE)
+ILIKE_PARAM = re.compile(r"\bILIKE\s+%s", re.IGNORECASE)
+PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+INSERT_COLUMNS = re.compile(r"\s*INSERT\s+INTO\s+[\w.]+\s*\(([^)]*)\)", re.IGNORECASE)
+COMPARED_PARAM = re.compile(r"(?:(\w+)\s*=\s*(?:ANY\(\s*)?)?%s", re.IGNORECASE)
+
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("date", lambda value: datetime.date.fromisoformat(value.decode()))
+sqlite3.register_converter("decimal", lambda value: Decimal(value.decode()))
+
+
+def plain(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+@lru_cache(maxsize=512)
+def sqlite_sql(query):
+    query = ANY_PARAM.sub("IN (SELECT value FROM json_each(%s))", query)
+    query = ILIKE_PARAM.sub(r"LIKE %s ESCAPE '\\'", query)
+
+    def replace(match):
+        if match.group(1):
+            return f":{match.group(1)}"
+        return "?" if match.group(0) == "%s" else "%"
+
+    return PLACEHOLDER.sub(replace, query)
+
+
+def sqlite_value(value):
+    if isinstance(value, (list, tuple)):
+        return json.dumps([plain(item) for item in value])
+    return value
+
+
+def sqlite_query(query, params=None):
+    if params is None:
+        return query, ()
+    if isinstance(params, dict):
+        return sqlite_sql(query), {key: sqlite_value(value) for key, value in params.items()}
+    return sqlite_sql(query), [sqlite_value(value) for value in params]
+
+
+@lru_cache(maxsize=256)
+def like_pattern(pattern, escape):
+    parts = []
+    chars = iter(pattern)
+    for char in chars:
+        if escape and char == escape:
+            parts.append(re.escape(next(chars, "")))
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def like(pattern, value, escape=None):
+    if pattern is None or value is None:
+        return None
+    return like_pattern(pattern, escape).fullmatch(str(value)) is not None
+
+
+def key_columns(table):
+    return {TABLES[table][0]} | {
+        column for references in REFERENCES.values() for source, column in references if source == table
+    }
+
+
+def param_columns(query):
+    columns = INSERT_COLUMNS.match(query)
+    if columns:
+        return [name.strip() for name in columns.group(1).split(",")]
+    return [match.group(1) for match in COMPARED_PARAM.finditer(query)]
+
+
+def key_params(table, query):
+    keys = key_columns(table)
+    return [position for position, column in enumerate(param_columns(query)) if column in keys]
+
+
+def key_values(values, positions):
+    result = set()
+    for position in positions:
+        value = values[position]
+        result.update(value if isinstance(value, list) else [value])
+    return result
+
+
+def remap(values, positions, ids):
+    values = list(values)
+    for position in positions:
+        value = values[position]
+        if isinstance(value, list):
+            values[position] = [ids.get(item, item) for item in value]
+        else:
+            values[position] = ids.get(value, value)
+    return values
+
+
+class LocalReplica:
+    batch_size = 2000
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.ready = False
+        self.pending = 0
+        self.dirty = {}
+        self.conn = self.connect()
+        self.create_schema()
+
+    def connect(self):
+        conn = sqlite3.connect(":memory:", timeout=30, detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (self.path,))
+        conn.execute(f"PRAGMA {SCHEMA}.journal_mode = WAL")
+        conn.execute(f"PRAGMA {SCHEMA}.synchronous = FULL")
+        conn.create_function("like", 2, like, deterministic=True)
+        conn.create_function("like", 3, like, deterministic=True)
+        return conn
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def create_schema(self):
+        with self.transaction() as cursor:
+            version = cursor.execute(f"PRAGMA {SCHEMA}.user_version").fetchone()[0]
+            if version != REPLICA_VERSION:
+                for table in TABLES:
+                    cursor.execute(f"DROP TABLE IF EXISTS {SCHEMA}.{table}")
+                cursor.execute(f"DROP TABLE IF EXISTS {SCHEMA}.sync_state")
+            for table, (key, columns) in TABLES.items():
+                fields = ", ".join(f"{name} {kind}" for name, kind in columns)
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{table} ({key} integer PRIMARY KEY, {fields})")
+            for statement in QUEUE_DDL:
+                cursor.execute(statement)
+            columns = [row[1] for row in cursor.execute(f"PRAGMA {SCHEMA}.table_info(pending_writes)")]
+            if 'key_params' not in columns:
+                cursor.execute(
+                    f"ALTER TABLE {SCHEMA}.pending_writes ADD COLUMN key_params text NOT NULL DEFAULT '[]'")
+                for entry, table, query in cursor.execute(
+                        f"SELECT id, table_name, query FROM {SCHEMA}.pending_writes").fetchall():
+                    cursor.execute(f"UPDATE {SCHEMA}.pending_writes SET key_params = ? WHERE id = ?",
+                                   (json.dumps(key_params(table, query)), entry))
+            cursor.execute(f"PRAGMA {SCHEMA}.user_version = {REPLICA_VERSION}")
+            self.update_state(cursor)
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def update_state(self, cursor):
+        synced = cursor.execute(f"SELECT count(*) FROM {SCHEMA}.sync_state").fetchone()[0]
+        self.ready = synced == len(TABLES)
+        self.pending = cursor.execute(
+            f"SELECT count(*) FROM {SCHEMA}.pending_writes WHERE status = 'pending'").fetchone()[0]
+
+    def query(self, query, params=None):
+        sql, args = sqlite_query(query, params)
+        with self.lock:
+            return self.conn.execute(sql, args).fetchall()
+
+    def columns(self, table):
+        key, columns = TABLES[table]
+        return [key] + [name for name, kind in columns]
+
+    def rows(self, cursor, table, ids):
+        key = TABLES[table][0]
+        cursor.execute(
+            f"SELECT {', '.join(self.columns(table))} FROM {SCHEMA}.{table} "
+            f"WHERE {key} IN (SELECT value FROM json_each(?))", (json.dumps(ids),))
+        return {row[0]: [plain(value) for value in row] for row in cursor.fetchall()}
+
+    def row_keys(self, table):
+        keys = key_columns(table)
+        return [position for position, name in enumerate(self.columns(table)) if name in keys]
+
+    def touch(self, table, ids):
+        if table in self.dirty:
+            self.dirty[table].update(ids)
+
+    def remove(self, cursor, table, ids):
+        if not ids:
+            return
+        self.touch(table, ids)
+        key = TABLES[table][0]
+        ids = json.dumps(ids)
+        cursor.execute(f"DELETE FROM {SCHEMA}.{table} WHERE {key} IN (SELECT value FROM json_each(?))", (ids,))
+        for source, column in REFERENCES.get(table, []):
+            cursor.execute(
+                f"UPDATE {SCHEMA}.{source} SET {column} = NULL "
+                f"WHERE {column} IN (SELECT value FROM json_each(?))", (ids,))
+
+    def delete(self, table, ids):
+        with self.transaction() as cursor:
+            self.remove(cursor, table, ids)
+
+    def pull(self, conn, table, ids):
+        ids = list(ids)
+        names = self.columns(table)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(names)} FROM {SCHEMA}.{table} WHERE {names[0]} = ANY(%s)", (ids,))
+            rows = cursor.fetchall()
+
+        found = {row[0] for row in rows}
+        missing = [row_id for row_id in ids if row_id not in found]
+        with self.transaction() as cursor:
+            self.touch(table, ids)
+            existing = set(self.rows(cursor, table, ids))
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {SCHEMA}.{table} ({', '.join(names)}) "
+                f"VALUES ({', '.join(['?'] * len(names))})", rows)
+            self.remove(cursor, table, missing)
+        return [
+            (table, 'UPDATE' if row_id in existing else 'INSERT', row_id) for row_id in sorted(found)
+        ] + [(table, 'DELETE', row_id) for row_id in missing if row_id in existing]
+
+    def snapshot(self, conn, tables=None):
+        for table in tables or TABLES:
+            if self.pending:
+                break
+            key = TABLES[table][0]
+            names = self.columns(table)
+            staging = f"{SCHEMA}.{table}_snapshot"
+            insert = f"INSERT INTO {staging} ({', '.join(names)}) VALUES ({', '.join(['?'] * len(names))})"
+            with self.transaction() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+                cursor.execute(f"CREATE TABLE {staging} AS SELECT * FROM {SCHEMA}.{table} WHERE 0")
+                self.dirty[table] = set()
+            try:
+                with conn.cursor(name=f"replica_{table}") as source:
+                    source.itersize = self.batch_size
+                    source.execute(f"SELECT {', '.join(names)} FROM {SCHEMA}.{table}")
+                    rows = source.fetchmany(self.batch_size)
+                    while rows:
+                        with self.transaction() as cursor:
+                            cursor.executemany(insert, rows)
+                        rows = source.fetchmany(self.batch_size)
+                conn.commit()
+
+                with self.transaction() as cursor:
+                    dirty = json.dumps(sorted(self.dirty.pop(table)))
+                    if not self.pending:
+                        cursor.execute(
+                            f"DELETE FROM {SCHEMA}.{table} WHERE {key} NOT IN (SELECT value FROM json_each(?))",
+                            (dirty,))
+                        cursor.execute(
+                            f"INSERT INTO {SCHEMA}.{table} SELECT * FROM {staging} "
+                            f"WHERE {key} NOT IN (SELECT value FROM json_each(?))", (dirty,))
+                        cursor.execute(
+                            f"INSERT OR REPLACE INTO {SCHEMA}.sync_state (table_name, synced_at) "
+                            f"VALUES (?, CURRENT_TIMESTAMP)", (table,))
+                    cursor.execute(f"DROP TABLE {staging}")
+                    self.update_state(cursor)
+            finally:
+                with self.lock:
+                    self.dirty.pop(table, None)
+
+    def queue(self, table, action, query, params, select):
+        key = TABLES[table][0]
+        sql, args = sqlite_query(query.rstrip(), params)
+        positions = key_params(table, query)
+        with self.transaction() as cursor:
+            base = {}
+            if action != 'INSERT':
+                cursor.execute("SAVEPOINT probe")
+                ids = [row[0] for row in cursor.execute(f"{sql} RETURNING {key}", args).fetchall()]
+                cursor.execute("ROLLBACK TO probe")
+                cursor.execute("RELEASE probe")
+                targets = key_values(list(params), [
+                    position for position, column in enumerate(param_columns(query)) if column == key])
+                if not ids or not targets <= set(ids):
+                    return None
+                base = self.rows(cursor, table, ids)
+
+            cursor.execute(
+                f"INSERT INTO {SCHEMA}.pending_writes (table_name, action, query, params, key_params) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                (table, action, query, json.dumps(list(params), default=plain), json.dumps(positions)))
+            entry = cursor.lastrowid
+
+            if action == 'INSERT':
+                cursor.execute(sql, args)
+                ids = [-entry]
+                cursor.execute(f"UPDATE {SCHEMA}.{table} SET {key} = ? WHERE rowid = ?", (-entry, cursor.lastrowid))
+
+            select_sql, select_args = sqlite_query(
+                f"SELECT * FROM ({select.format(source=f'{SCHEMA}.{table}')}) q "
+                f"WHERE q.{key} = ANY(%s) ORDER BY 1", (ids,))
+            if action == 'DELETE':
+                rows = cursor.execute(select_sql, select_args).fetchall()
+                self.remove(cursor, table, ids)
+            else:
+                if action == 'UPDATE':
+                    cursor.execute(sql, args)
+                rows = cursor.execute(select_sql, select_args).fetchall()
+
+            cursor.execute(
+                f"UPDATE {SCHEMA}.pending_writes SET row_ids = ?, base = ? WHERE id = ?",
+                (json.dumps(ids), json.dumps(base), entry))
+            self.update_state(cursor)
+        return rows
+
+    def replay(self, conn):
+        import psycopg2
+
+        changes = []
+        conflicts = []
+        with self.lock:
+            entries = self.conn.execute(
+                f"SELECT id, table_name, action, query, params, key_params, row_ids, base "
+                f"FROM {SCHEMA}.pending_writes WHERE status = 'pending' ORDER BY id").fetchall()
+
+        ids_map = {}
+        skipped = set()
+        for entry, table, action, query, params, positions, row_ids, base in entries:
+            if entry in skipped:
+                continue
+            key = TABLES[table][0]
+            row_keys = self.row_keys(table)
+            params = remap(json.loads(params), json.loads(positions), ids_map)
+            ids = [ids_map.get(row_id, row_id) for row_id in json.loads(row_ids)]
+            base = {ids_map.get(int(row_id), int(row_id)): remap(row, row_keys, ids_map)
+                    for row_id, row in json.loads(base).items()}
+            temp_id = ids[0] if action == 'INSERT' else None
+            try:
+                with conn.cursor() as cursor:
+                    stale = self.stale_rows(cursor, table, base)
+                    if not stale:
+                        cursor.execute(f"{query.rstrip()} RETURNING {key}", params)
+                        applied = [row[0] for row in cursor.fetchall()]
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                raise
+            except psycopg2.Error as e:
+                conn.rollback()
+                conflicts.append(f"{table}: изменение отклонено сервером: {str(e).strip()}")
+                dependents = self.finish(entry, 'error', str(e), table=table, temp_id=temp_id)
+                changes.extend(self.reject(conn, table, ids, dependents, conflicts, skipped))
+                continue
+
+            if stale:
+                conn.rollback()
+                message = (f"{table}: записи {', '.join(map(str, stale))} изменены другим пользователем, "
+                           f"локальное изменение отменено")
+                conflicts.append(message)
+                dependents = self.finish(entry, 'conflict', message, table=table, temp_id=temp_id)
+                changes.extend(self.reject(conn, table, ids, dependents, conflicts, skipped))
+                continue
+
+            try:
+                conn.commit()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                message = (f"{table}: связь потеряна при подтверждении изменения, "
+                           f"проверьте его вручную: {str(e).strip()}")
+                conflicts.append(message)
+                dependents = self.finish(entry, 'error', message, table=table, temp_id=temp_id)
+                conflicts.extend(dependent[-1] for dependent in dependents)
+                break
+
+            if action == 'INSERT':
+                new_id = applied[0]
+                ids_map[temp_id] = new_id
+                self.finish(entry, None, table=table, temp_id=temp_id, new_id=new_id)
+                changes.append((table, 'DELETE', temp_id))
+                changes.extend(self.pull(conn, table, [new_id]))
+            else:
+                self.finish(entry, None)
+                if action == 'UPDATE':
+                    changes.extend(self.pull(conn, table, applied))
+        return changes, conflicts
+
+    def reject(self, conn, table, ids, dependents, conflicts, skipped):
+        changes = self.pull(conn, table, ids)
+        for later, later_table, later_ids, message in dependents:
+            skipped.add(later)
+            conflicts.append(message)
+            changes.extend(self.pull(conn, later_table, later_ids))
+        return changes
+
+    def stale_rows(self, cursor, table, base):
+        if not base:
+            return []
+        names = self.columns(table)
+        cursor.execute(
+            f"SELECT {', '.join(names)} FROM {SCHEMA}.{table} WHERE {names[0]} = ANY(%s) FOR UPDATE",
+            (list(base),))
+        current = {row[0]: [plain(value) for value in row] for row in cursor.fetchall()}
+        return [row_id for row_id, row in base.items() if current.get(row_id) != row]
+
+    def finish(self, entry, status, error=None, table=None, temp_id=None, new_id=None):
+        dependents = []
+        with self.transaction() as cursor:
+            if status is None:
+                cursor.execute(f"DELETE FROM {SCHEMA}.pending_writes WHERE id = ?", (entry,))
+            else:
+                cursor.execute(
+                    f"UPDATE {SCHEMA}.pending_writes SET status = ?, error = ? WHERE id = ?",
+                    (status, error, entry))
+            if temp_id is not None:
+                cursor.execute(
+                    f"SELECT id, table_name, action, params, key_params, row_ids, base "
+                    f"FROM {SCHEMA}.pending_writes WHERE status = 'pending' ORDER BY id")
+                later_entries = cursor.fetchall()
+                if new_id is None:
+                    dependents = self.fail_dependents(cursor, later_entries, temp_id)
+                else:
+                    self.remap_entries(cursor, later_entries, table, temp_id, new_id)
+            self.update_state(cursor)
+        return dependents
+
+    def fail_dependents(self, cursor, entries, temp_id):
+        failed = {temp_id}
+        dependents = []
+        for later, table, action, params, positions, row_ids, base in entries:
+            row_ids = json.loads(row_ids)
+            keys = key_values(json.loads(params), json.loads(positions)) | set(row_ids)
+            for row in json.loads(base).values():
+                keys |= key_values(row, self.row_keys(table))
+            found = sorted(failed & keys)
+            if not found:
+                continue
+            if action == 'INSERT':
+                failed.add(-later)
+            message = (f"{table}: изменение зависит от неотправленной записи "
+                       f"{', '.join(map(str, found))}, локальное изменение отменено")
+            cursor.execute(
+                f"UPDATE {SCHEMA}.pending_writes SET status = 'conflict', error = ? WHERE id = ?",
+                (message, later))
+            dependents.append((later, table, row_ids, message))
+        return dependents
+
+    def remap_entries(self, cursor, entries, table, temp_id, new_id):
+        ids_map = {temp_id: new_id}
+        for later, later_table, action, params, positions, row_ids, base in entries:
+            row_keys = self.row_keys(later_table)
+            cursor.execute(
+                f"UPDATE {SCHEMA}.pending_writes SET params = ?, row_ids = ?, base = ? WHERE id = ?",
+                (json.dumps(remap(json.loads(params), json.loads(positions), ids_map)),
+                 json.dumps([ids_map.get(row_id, row_id) for row_id in json.loads(row_ids)]),
+                 json.dumps({str(ids_map.get(int(row_id), int(row_id))): remap(row, row_keys, ids_map)
+                             for row_id, row in json.loads(base).items()}),
+                 later))
+        cursor.execute(f"DELETE FROM {SCHEMA}.{table} WHERE {TABLES[table][0]} = ?", (temp_id,))
+        for source, column in REFERENCES.get(table, []):
+            cursor.execute(f"UPDATE {SCHEMA}.{source} SET {column} = ? WHERE {column} = ?",
+                           (new_id, temp_id))
@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replica
+
+
+SELECT = "SELECT * FROM {source}"
+MEDAL_INSERT = ("INSERT INTO sportsorganizations.medals (material, color, weight, quantity) "
+                "VALUES (%s, %s, %s, %s)")
+MEDAL_UPDATE = "UPDATE sportsorganizations.medals SET quantity = %s WHERE id_medal = %s"
+ATHLETE_INSERT = "INSERT INTO sportsorganizations.athletes (firstname, lastname) VALUES (%s, %s)"
+JUDGE_INSERT = ("INSERT INTO sportsorganizations.judges (firstname, lastname, id_athlete, id_medal) "
+                "VALUES (%s, %s, %s, %s)")
+JUDGE_UPDATE = ("UPDATE sportsorganizations.judges SET firstname = %s, id_athlete = %s, id_medal = %s "
+                "WHERE id_judge = %s")
+
+
+class SqliteSqlTest(unittest.TestCase):
+    def test_placeholders(self):
+        self.assertEqual(
+            replica.sqlite_sql("SELECT * FROM t WHERE a = %s AND b = %(name)s AND c LIKE 'x%%'"),
+            "SELECT * FROM t WHERE a = ? AND b = :name AND c LIKE 'x%'")
+
+    def test_any_and_ilike(self):
+        self.assertEqual(
+            replica.sqlite_sql("SELECT * FROM t WHERE id = ANY(%s) AND name ILIKE %s"),
+            "SELECT * FROM t WHERE id IN (SELECT value FROM json_each(?)) AND name LIKE ? ESCAPE '\\'")
+
+    def test_list_params_become_json(self):
+        sql, args = replica.sqlite_query("SELECT * FROM t WHERE id = ANY(%s)", ([1, 2],))
+        self.assertEqual(args, ["[1, 2]"])
+
+
+class LikeTest(unittest.TestCase):
+    def test_unicode_case_insensitive(self):
+        self.assertTrue(replica.like("%имя%", "ИМЯ12"))
+        self.assertFalse(replica.like("имя", "ИМЯ12"))
+
+    def test_wildcards_and_escape(self):
+        self.assertTrue(replica.like("a_c", "abc"))
+        self.assertFalse(replica.like("a\\_c", "abc", "\\"))
+        self.assertTrue(replica.like("50\\%", "50%", "\\"))
+
+    def test_null(self):
+        self.assertIsNone(replica.like("%", None))
+
+
+class KeyParamsTest(unittest.TestCase):
+    def test_insert_columns(self):
+        self.assertEqual(replica.param_columns(JUDGE_INSERT), ["firstname", "lastname", "id_athlete", "id_medal"])
+        self.assertEqual(replica.key_params('judges', JUDGE_INSERT), [2, 3])
+
+    def test_update_skips_plain_values(self):
+        self.assertEqual(replica.param_columns(MEDAL_UPDATE), ["quantity", "id_medal"])
+        self.assertEqual(replica.key_params('medals', MEDAL_UPDATE), [1])
+        self.assertEqual(replica.key_params('judges', JUDGE_UPDATE), [1, 2, 3])
+
+    def test_any(self):
+        query = "UPDATE sportsorganizations.athletes SET sport_rank = %s WHERE id_athlete = ANY(%s)"
+        self.assertEqual(replica.key_params('athletes', query), [1])
+
+    def test_remap_only_key_positions(self):
+        self.assertEqual(replica.remap([-3, -3], [1], {-3: 40}), [-3, 40])
+        self.assertEqual(replica.remap(["x", [-3, 5]], [1], {-3: 40}), ["x", [40, 5]])
+
+
+class QueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.replica = replica.LocalReplica(os.path.join(self.directory, "replica.sqlite3"))
+        with self.replica.transaction() as cursor:
+            cursor.execute("INSERT INTO sportsorganizations.medals VALUES (1, 'Золото', 'жёлтый', 500, 10)")
+            cursor.execute("INSERT INTO sportsorganizations.athletes (id_athlete, firstname) VALUES (1, 'Имя')")
+
+    def tearDown(self):
+        self.replica.close()
+        shutil.rmtree(self.directory)
+
+    def entries(self):
+        return self.replica.query(
+            "SELECT id, status, params, key_params, base FROM sportsorganizations.pending_writes ORDER BY id")
+
+    def test_update_records_base(self):
+        rows = self.replica.queue('medals', 'UPDATE', MEDAL_UPDATE, (7, 1), SELECT)
+        self.assertEqual(rows[0][4], 7)
+        self.assertEqual(self.replica.pending, 1)
+        entry, status, params, positions, base = self.entries()[0]
+        self.assertEqual(json.loads(positions), [1])
+        self.assertEqual(json.loads(base), {"1": [1, "Золото", "жёлтый", 500, 10]})
+
+    def test_missing_rows_are_refused(self):
+        self.assertIsNone(self.replica.queue('medals', 'UPDATE', MEDAL_UPDATE, (7, 99), SELECT))
+        self.assertIsNone(self.replica.queue(
+            'medals', 'DELETE', "DELETE FROM sportsorganizations.medals WHERE id_medal = ANY(%s)", ([1, 99],),
+            SELECT))
+        self.assertEqual(self.replica.pending, 0)
+        self.assertEqual(self.entries(), [])
+
+    def test_insert_gets_temporary_id(self):
+        rows = self.replica.queue('athletes', 'INSERT', ATHLETE_INSERT, ("Новый", "Офлайн"), SELECT)
+        self.assertEqual(rows[0][0], -1)
+        rows = self.replica.queue('judges', 'INSERT', JUDGE_INSERT, ("Судья", "Офлайн", -1, 1), SELECT)
+        self.assertEqual(rows[0][0], -2)
+        self.assertEqual(rows[0][6], -1)
+
+    def test_finish_remaps_only_keys(self):
+        self.replica.queue('athletes', 'INSERT', ATHLETE_INSERT, ("Новый", "Офлайн"), SELECT)
+        self.replica.queue('judges', 'INSERT', JUDGE_INSERT, ("Судья", "Офлайн", -1, 1), SELECT)
+        self.replica.queue('medals', 'UPDATE', MEDAL_UPDATE, (-1, 1), SELECT)
+
+        self.replica.finish(1, None, table='athletes', temp_id=-1, new_id=40)
+        entries = self.entries()
+        self.assertEqual(json.loads(entries[0][2]), ["Судья", "Офлайн", 40, 1])
+        self.assertEqual(json.loads(entries[1][2]), [-1, 1])
+        self.assertEqual(self.replica.query(
+            "SELECT id_athlete FROM sportsorganizations.judges WHERE id_judge = -2"), [(40,)])
+        self.assertEqual(self.replica.query(
+            "SELECT id_athlete FROM sportsorganizations.athletes WHERE id_athlete = -1"), [])
+        self.assertEqual(self.replica.pending, 2)
+
+    def test_rejected_insert_fails_dependents(self):
+        self.replica.queue('athletes', 'INSERT', ATHLETE_INSERT, ("Новый", "Офлайн"), SELECT)
+        self.replica.queue('judges', 'INSERT', JUDGE_INSERT, ("Судья", "Офлайн", -1, 1), SELECT)
+        self.replica.queue('judges', 'UPDATE', JUDGE_UPDATE, ("Судья", None, 1, -2), SELECT)
+        self.replica.queue('medals', 'UPDATE', MEDAL_UPDATE, (-1, 1), SELECT)
+
+        dependents = self.replica.finish(1, 'error', "rejected", table='athletes', temp_id=-1)
+        self.assertEqual([(entry, table) for entry, table, _, _ in dependents], [(2, 'judges'), (3, 'judges')])
+        self.assertEqual([status for _, status, _, _, _ in self.entries()], ['error', 'conflict', 'conflict', 'pending'])
+        self.assertEqual(self.replica.pending, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()